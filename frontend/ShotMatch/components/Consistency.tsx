@@ -11,13 +11,11 @@ import {
 } from 'react-native';
 import * as ImagePicker from 'expo-image-picker';
 import * as VideoThumbnails from 'expo-video-thumbnails';
-import * as FileSystem from 'expo-file-system';
 import Constants from 'expo-constants';
 
 interface VideoData {
   videoUri: string;
   thumbnailUri: string;
-  base64Data?: string;
 }
 
 interface ConsistencyUploadProps {
@@ -99,31 +97,26 @@ const Consistency: React.FC<ConsistencyUploadProps> = ({ navigation }) => {
     }
     setUploading(true);
     try {
-      // Convert videos to base64
-      const convertVideos = async (videos: VideoData[]): Promise<VideoData[]> => {
-        return Promise.all(
-          videos.map(async video => {
-            const base64Data = await FileSystem.readAsStringAsync(video.videoUri, {
-              encoding: FileSystem.EncodingType.Base64,
-            });
-            return { ...video, base64Data };
-          })
-        );
-      };
-
-      const convertedFrontVideos = await convertVideos(frontVideos);
-      const convertedSideVideos = await convertVideos(sideVideos);
-
-      const payload = {
-        frontVideos: convertedFrontVideos,
-        sideVideos: convertedSideVideos,
+      // Send the files as multipart parts so they are streamed from disk
+      // instead of being loaded into memory as base64 strings
+      const formData = new FormData();
+      const appendVideos = (field: string, videos: VideoData[]) => {
+        videos.forEach((video, index) => {
+          formData.append(field, {
+            uri: video.videoUri,
+            name: video.videoUri.split('/').pop() || `${field}_${index}.mp4`,
+            type: 'video/mp4',
+          } as any);
+        });
       };
+      appendVideos('frontVideos', frontVideos);
+      appendVideos('sideVideos', sideVideos);
 
       const backendUrl: string = Constants.expoConfig?.extra?.backendUrl;
+      // fetch sets the multipart boundary header itself
       const response = await fetch(`http://${backendUrl}:5000/process_consistency_videos`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload),
+        body: formData,
       });
 
       if (response.ok) {
@@ -2,13 +2,10 @@ import React, { useEffect, useState } from 'react';
 import { View, Text, ActivityIndicator, StyleSheet } from 'react-native';
 import { useRoute, RouteProp } from '@react-navigation/native';
 import Constants from 'expo-constants';
-import * as FileSystem from 'expo-file-system';
 
 type VideoData = {
   videoUri: string;
   thumbnailUri: string;
-  // Will add a base64 field after conversion
-  base64Data?: string;
 };
 
 type RootStackParamList = {
@@ -31,25 +28,23 @@ const ProcessVideos: React.FC<HomeProps> = ({ navigation }) => {
   useEffect(() => {
     const sendVideos = async () => {
       try {
-        // Convert local video files to base64 strings
-        const convertedVideos = await Promise.all(
-          videos.map(async (video) => {
-            const base64Data = await FileSystem.readAsStringAsync(video.videoUri, {
-              encoding: FileSystem.EncodingType.Base64,
-            });
-            return { ...video, base64Data };
-          })
-        );
-        // console.log('Converted Videos:', convertedVideos);
+        // Send the files as multipart parts so they are streamed from disk
+        // instead of being loaded into memory as base64 strings
+        const formData = new FormData();
+        videos.forEach((video, index) => {
+          formData.append('videos', {
+            uri: video.videoUri,
+            name: video.videoUri.split('/').pop() || `video_${index}.mp4`,
+            type: 'video/mp4',
+          } as any);
+        });
 
         const backendUrl: string = Constants.expoConfig?.extra?.backendUrl;
         console.log('Backend URL:', backendUrl);
+        // fetch sets the multipart boundary header itself
         const response = await fetch(`http://${backendUrl}:5000/process_videos`, {
           method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({ videos: convertedVideos }),
+          body: formData,
         });
         if (response.ok) {
           const jsonData = await response.json();
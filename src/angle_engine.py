@@ -0,0 +1,88 @@
+import numpy as np
+
+
+def _points(coords):
+    # (N, 2) float array from a list of [x, y] pairs or an existing array
+    return np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def _lengths(vectors):
+    return np.sqrt(vectors[:, 0] ** 2 + vectors[:, 1] ** 2)
+
+
+def calculate_angles(vertex, a, b):
+    """
+    Vectorized calculate_angle: angle (in degrees) for a -> vertex -> b on every row.
+
+    Inputs:
+        vertex  = (N, 2) coordinates of the vertex (e.g., elbow)
+        a       = (N, 2) coordinates of point 1 (e.g., shoulder)
+        b       = (N, 2) coordinates of point 3 (e.g., wrist)
+
+    Output:
+        (N,) numpy array of angles in degrees; 0.0 where either segment has zero length,
+        like the scalar version.
+    """
+    vertex = _points(vertex)
+    AV = _points(a) - vertex
+    BV = _points(b) - vertex
+
+    dot_product = AV[:, 0] * BV[:, 0] + AV[:, 1] * BV[:, 1]
+    AV_magnitude = _lengths(AV)
+    BV_magnitude = _lengths(BV)
+    magnitudes = AV_magnitude * BV_magnitude
+    valid = (AV_magnitude != 0) & (BV_magnitude != 0)
+
+    cos_value = np.divide(dot_product, magnitudes, out=np.ones_like(dot_product), where=valid)
+    np.clip(cos_value, -1.0, 1.0, out=cos_value)
+    angles = np.degrees(np.arccos(cos_value))
+    angles[~valid] = 0.0
+    return angles
+
+
+def elbow_comparison(left_elbow, right_elbow, wrist):
+    """
+    Vectorized elbow comparison metric:
+        EC = |left_elbow_y - right_elbow_y| / (distance between wrist and left_elbow)
+
+    Inputs:
+        left_elbow, right_elbow, wrist = (N, 2) coordinates
+
+    Output:
+        (N,) numpy array of ratios; 0.0 where the wrist and left elbow coincide.
+    """
+    left_elbow = _points(left_elbow)
+    diff_y = np.abs(left_elbow[:, 1] - _points(right_elbow)[:, 1])
+    length_left_arm = _lengths(_points(wrist) - left_elbow)
+    return np.divide(diff_y, length_left_arm, out=np.zeros_like(diff_y), where=length_left_arm != 0)
+
+
+def arm_angles(shoulder, elbow, wrist, pinky, index):
+    """
+    Side-view angles for every frame at once.
+
+    Outputs:
+        sew = Shoulder -> Elbow -> Wrist angles (vertex = elbow)
+        ewa = Elbow -> Wrist -> Average(Pinky, Index) angles (vertex = wrist)
+    """
+    avg_pinky_index = (_points(pinky) + _points(index)) / 2
+    sew = calculate_angles(elbow, shoulder, wrist)
+    ewa = calculate_angles(wrist, elbow, avg_pinky_index)
+    return sew, ewa
+
+
+def front_angles(hip, shoulder, left_elbow, right_elbow, wrist, pinky):
+    """
+    Front-view metrics for every frame at once.
+
+    Outputs:
+        hse = Hip -> Shoulder -> Elbow angles (vertex = shoulder)
+        sew = Shoulder -> Elbow -> Wrist angles (vertex = elbow)
+        ewp = Elbow -> Wrist -> Pinky angles (vertex = wrist)
+        ec  = elbow comparison ratios
+    """
+    hse = calculate_angles(shoulder, hip, left_elbow)
+    sew = calculate_angles(left_elbow, shoulder, wrist)
+    ewp = calculate_angles(wrist, left_elbow, pinky)
+    ec = elbow_comparison(left_elbow, right_elbow, wrist)
+    return hse, sew, ewp, ec
@@ -1,28 +1,235 @@
 import os
 import base64
+import binascii
+import shutil
+import uuid
 from flask import Flask, request, jsonify
 import datetime
 import jwt
 from functools import wraps
 import time
-import OCR_mediapipe as ocr
+import recognition_model as ocr
 from werkzeug.security import generate_password_hash, check_password_hash
-from database import connect_to_mongodb, add_user, get_user_by_email
+from database import connect_to_mongodb, add_user, get_user_by_email, ensure_indexes
+from pose_cache import PoseCache
+from job_queue import JobQueue
+from video_pool import VideoPool
+from uploads import StreamingUploadRequest, uploaded_file_path, link_or_copy
+from response_encoding import encoded_response, response_metrics
 
 # Constants
 SECRET_KEY = "your_secret_key"
 DB_NAME = "auth_db"
+POSE_CACHE_DIR = os.getenv("POSE_CACHE_DIR", "/tmp/shotmatch_pose_cache")
+POSE_CACHE_MAX_BYTES = int(os.getenv("POSE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "/tmp/shotmatch_jobs.sqlite3")
+JOB_DIR = os.getenv("JOB_DIR", "/tmp/shotmatch_jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# job workers analyze their clips one after another, so they split the cores between them
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", max(1, (os.cpu_count() or 1) // JOB_WORKERS)))
+MAX_JOB_WAIT_SECONDS = 30
+VIDEO_POOL_WORKERS = int(os.getenv("VIDEO_POOL_WORKERS", os.cpu_count() or 1))
+# one inference thread per worker so parallel clips do not oversubscribe the CPU
+VIDEO_POOL_THREADS = int(os.getenv("VIDEO_POOL_THREADS", 1))
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/shotmatch_uploads")
+# Load and warm the models before any worker is forked so workers inherit them
+WARM_UP_MODELS = os.getenv("WARM_UP_MODELS", "1") == "1"
 
 # Initialize Flask App
 app = Flask(__name__)
+# Multipart video uploads are streamed to UPLOAD_DIR instead of being held in memory
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+StreamingUploadRequest.upload_dir = UPLOAD_DIR
+app.request_class = StreamingUploadRequest
 
 # Connect to MongoDB
 success, db = connect_to_mongodb(DB_NAME)
 if not success:
     raise Exception("Failed to connect to MongoDB")
+success, error = ensure_indexes(db)
+if not success:
+    # lookups still work without the indexes, just slower
+    print(f"Warning: failed to create MongoDB indexes: {error}")
 users_collection = db["users"]
 
+# Repeat uploads of the same clip are served from here instead of re-running the models
+pose_cache = PoseCache(POSE_CACHE_DIR, POSE_CACHE_MAX_BYTES)
+
 # Helper Functions
+def run_analysis_job(payload, progress):
+    # Runs in a job worker process: analyzes every saved clip of the job and
+    # builds the same response body as the synchronous endpoints
+    groups = payload["groups"]
+    profile = payload.get("profile")
+    window = payload.get("window") or {}
+    paths = [path for name in groups for path in groups[name]]
+    totals = {path: ocr.count_frames(path, **window) for path in paths}
+    total_frames = sum(totals.values())
+    done = 0
+    results = {}
+    try:
+        for name, group in groups.items():
+            results[name] = []
+            for path in group:
+                ocr_result = pose_cache.analyze(path, ocr.analyze_video, ocr.model_settings(profile),
+                                                progress=lambda frames, _: progress(done + frames, total_frames),
+                                                profile=profile, **window)
+                if not ocr_result:
+                    raise Exception(f"Failed to process video {os.path.basename(path)}")
+                results[name].append(ocr_result)
+                done += totals[path]
+                progress(done, total_frames)
+    finally:
+        shutil.rmtree(payload["dir"], ignore_errors=True)
+
+    if payload["kind"] == "process_videos":
+        return {
+            "message": "Videos processed successfully",
+            "processed_count": len(results["data"]),
+            "data": results["data"]
+        }
+    return {
+        "message": "Consistency videos processed successfully",
+        "front_processed_count": len(results["front_data"]),
+        "side_processed_count": len(results["side_data"]),
+        "front_data": results["front_data"],
+        "side_data": results["side_data"]
+    }
+
+def decode_uploaded_videos(videos, label):
+    # Decodes the base64 uploads in memory; returns (list of bytes, None) or (None, error body)
+    decoded = []
+    for video in videos:
+        base64_data = video.get("base64Data")
+        if not base64_data:
+            return None, {"message": f"Missing base64 data for {label}", "video": video.get("videoUri")}
+        try:
+            decoded.append(base64.b64decode(base64_data, validate=True))
+        except (binascii.Error, ValueError):
+            return None, {"message": f"Invalid base64 data for {label}", "video": video.get("videoUri")}
+    return decoded, None
+
+def gather_videos(field, label, keep_dir=None):
+    # Returns (videos, sources, None) or (None, None, error body). A source is a
+    # file path for multipart uploads, which were already streamed to disk while
+    # the body was parsed, and the decoded bytes for base64 JSON uploads, which
+    # are analyzed straight from memory. With keep_dir every upload is saved
+    # there under a unique name so it outlives the request.
+    if request.mimetype == "multipart/form-data":
+        files = [f for f in request.files.getlist(field) if f.filename]
+        if not files:
+            return None, None, {"message": f"No {label}s provided or invalid format"}
+        videos = [{"videoUri": f.filename} for f in files]
+        sources = [uploaded_file_path(f) for f in files]
+    else:
+        data_json = request.get_json(silent=True) or {}
+        videos = data_json.get(field)
+        if not videos or not isinstance(videos, list):
+            return None, None, {"message": f"No {label}s provided or invalid format"}
+        sources, error = decode_uploaded_videos(videos, label)
+        if error:
+            return None, None, error
+
+    if keep_dir is not None:
+        kept = []
+        for position, (video, source) in enumerate(zip(videos, sources)):
+            kept_path = os.path.join(keep_dir, f"{field}_{position}_{os.path.basename(video.get('videoUri') or 'clip')}")
+            if isinstance(source, bytes):
+                with open(kept_path, "wb") as f:
+                    f.write(source)
+            else:
+                link_or_copy(source, kept_path)
+            kept.append(kept_path)
+        sources = kept
+    return videos, sources, None
+
+def requested_profile():
+    # Detector profile chosen by the client (?profile=, a form field or the JSON body);
+    # returns (profile name, None) or (None, error body)
+    data_json = request.get_json(silent=True) if request.is_json else None
+    profile = request.values.get("profile") or (data_json or {}).get("profile")
+    try:
+        name, _ = ocr.detector_profile(profile)
+    except ValueError as error:
+        return None, {"message": str(error)}
+    return name, None
+
+def requested_window():
+    # Optional time window of the clips to analyze, in seconds (?start=&end=, form
+    # fields or the JSON body); returns (analyze_video options, None) or (None, error body)
+    data_json = request.get_json(silent=True) if request.is_json else None
+    window = {}
+    for name in ("start", "end"):
+        value = request.values.get(name) or (data_json or {}).get(name)
+        if value is None or value == "":
+            continue
+        try:
+            window[name] = float(value)
+        except (TypeError, ValueError):
+            return None, {"message": f"{name} must be a number of seconds"}
+    if window.get("start", 0) < 0 or ("end" in window and window["end"] <= window.get("start", 0)):
+        return None, {"message": "The window must satisfy 0 <= start < end"}
+    return window, None
+
+def analyze_clips(sources, profile, window=None):
+    # Serves cached clips directly and fans the rest out to the video pool;
+    # returns one (success, frames or error message) per source, in order
+    settings = ocr.model_settings(profile)
+    options = {"profile": profile, **(window or {})}
+    keys = [pose_cache.analysis_key(source, settings, **options) for source in sources]
+    outcomes = [None] * len(sources)
+    misses = []
+    for position, key in enumerate(keys):
+        frames = pose_cache.get(key)
+        if frames is not None:
+            outcomes[position] = (True, frames)
+        else:
+            misses.append(position)
+    if misses:
+        for position, outcome in zip(misses, video_pool.map([sources[p] for p in misses], **options)):
+            success, frames = outcome
+            if success and frames:
+                pose_cache.put(keys[position], frames)
+            outcomes[position] = outcome
+    return outcomes
+
+def collect_results(videos, outcomes, label):
+    # Splits pool outcomes into the response data list and per-clip errors
+    results = []
+    errors = []
+    for video, (success, value) in zip(videos, outcomes):
+        video_uri = video.get("videoUri")
+        if not success:
+            print(f"Error processing {label} {video_uri}: {value}")
+            errors.append({"video": video_uri, "error": value})
+            results.append(None)
+        elif not value:
+            errors.append({"video": video_uri, "error": f"Failed to process {label}"})
+            results.append(None)
+        else:
+            print(f"Processed {label} {video_uri} with {len(value)} frames")
+            results.append(value)
+    return results, errors
+
+def init_video_worker():
+    ocr.set_num_threads(VIDEO_POOL_THREADS)
+
+def init_job_worker():
+    ocr.set_num_threads(JOB_WORKER_THREADS)
+
+if WARM_UP_MODELS:
+    print(f"Models warmed up: {ocr.warm_up()}")
+
+# Independent clips of one request are analyzed in parallel by worker processes
+# that keep the models loaded between requests
+video_pool = VideoPool(ocr.analyze_video, max_workers=VIDEO_POOL_WORKERS, initializer=init_video_worker)
+
+# Long-running analysis requests are queued here and picked up by worker processes,
+# forked now while the process has no request threads yet
+os.makedirs(JOB_DIR, exist_ok=True)
+job_queue = JobQueue(JOB_DB_PATH, run_analysis_job, num_workers=JOB_WORKERS, initializer=init_job_worker)
+job_queue.start()
+
 def create_jwt_token(username):
     expiration = datetime.datetime.utcnow() + datetime.timedelta(hours=2)
     token = jwt.encode({"sub": username, "exp": expiration}, SECRET_KEY, algorithm="HS256")
@@ -78,150 +285,133 @@ def login():
 def protected_route(username):
     return jsonify({"message": "You are authorized", "user": username})
 
-@app.route("/process_videos", methods=["POST"])
-def process_videos():
-    data_json = request.get_json()
-    videos = data_json.get("videos")
-    if not videos or not isinstance(videos, list):
-        return jsonify({"message": "No videos provided or invalid format"}), 400
+@app.route("/pose_cache/stats", methods=["GET"])
+def pose_cache_stats():
+    return jsonify(pose_cache.stats())
 
-    processed_results = []  # List to hold each video's OCR output
-    processed_count = len(videos)
+@app.route("/model_stats", methods=["GET"])
+def get_model_stats():
+    # Import, load and warm-up times of the models in this process
+    return jsonify(ocr.model_load_report())
 
-    for video in videos:
-        video_uri = video.get("videoUri")
-        base64_data = video.get("base64Data")
-        if not base64_data:
-            return jsonify({"message": "Missing base64 data for video", "video": video_uri}), 400
+@app.route("/response_stats", methods=["GET"])
+def get_response_stats():
+    # Encoded size and encode time totals of the analysis endpoints
+    return jsonify(response_metrics.stats())
 
-        print(f"Processing video {video_uri}")
-        try:
-            # Decode the base64 video and write to a temporary file
-            temp_file_path = f"/tmp/{os.path.basename(video_uri)}"
-            with open(temp_file_path, "wb") as f:
-                f.write(base64.b64decode(base64_data))
-            
-            # Run OCR analysis on the temporary file
-            ocr_result = ocr.analyze_video(temp_file_path)
-            print(f"Processed video {video_uri} with data: {ocr_result}")
-
-            if not ocr_result:
-                return jsonify({
-                    "message": "Failed to process video",
-                    "video": video_uri,
-                    "data": None
-                }), 500
-
-            processed_results.append(ocr_result)
-        except Exception as e:
-            print(f"Error processing video {video_uri}: {e}")
-            return jsonify({
-                "message": "Error during video processing",
-                "video": video_uri,
-                "error": str(e)
-            }), 500
-        finally:
-            # Clean up the temporary file if it exists
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
+@app.route("/process_videos", methods=["POST"])
+def process_videos():
+    profile, error = requested_profile()
+    if error:
+        return jsonify(error), 400
+    window, error = requested_window()
+    if error:
+        return jsonify(error), 400
+    videos, sources, error = gather_videos("videos", "video")
+    if error:
+        return jsonify(error), 400
+    outcomes = analyze_clips(sources, profile, window)
 
-    return jsonify({
+    processed_results, errors = collect_results(videos, outcomes, "video")
+    if errors:
+        return encoded_response({
+            "message": "Error during video processing",
+            "errors": errors,
+            "processed_count": len(videos) - len(errors),
+            "data": processed_results
+        }, 500, frame_fields=("data",))
+
+    return encoded_response({
         "message": "Videos processed successfully",
-        "processed_count": processed_count,
+        "processed_count": len(videos),
         "data": processed_results
-    }), 200
+    }, 200, frame_fields=("data",))
 
 @app.route("/process_consistency_videos", methods=["POST"])
 def process_consistency_videos():
-    data_json = request.get_json()
-    front_videos = data_json.get("frontVideos")
-    side_videos = data_json.get("sideVideos")
-    
-    if not front_videos or not isinstance(front_videos, list):
-        return jsonify({"message": "No front videos provided or invalid format"}), 400
-    if not side_videos or not isinstance(side_videos, list):
-        return jsonify({"message": "No side videos provided or invalid format"}), 400
-
-    front_results = []
-    side_results = []
+    profile, error = requested_profile()
+    if error:
+        return jsonify(error), 400
+    window, error = requested_window()
+    if error:
+        return jsonify(error), 400
+    front_videos, front_sources, error = gather_videos("frontVideos", "front video")
+    if error:
+        return jsonify(error), 400
+    side_videos, side_sources, error = gather_videos("sideVideos", "side video")
+    if error:
+        return jsonify(error), 400
+    # Front and side clips are independent, so they all go to the pool at once
+    outcomes = analyze_clips(front_sources + side_sources, profile, window)
 
-    # Process front videos
-    for video in front_videos:
-        video_uri = video.get("videoUri")
-        base64_data = video.get("base64Data")
-        if not base64_data:
-            return jsonify({"message": "Missing base64 data for front video", "video": video_uri}), 400
+    front_results, front_errors = collect_results(front_videos, outcomes[:len(front_sources)], "front video")
+    side_results, side_errors = collect_results(side_videos, outcomes[len(front_sources):], "side video")
+    if front_errors or side_errors:
+        return encoded_response({
+            "message": "Error during consistency video processing",
+            "errors": front_errors + side_errors,
+            "front_processed_count": len(front_videos) - len(front_errors),
+            "side_processed_count": len(side_videos) - len(side_errors),
+            "front_data": front_results,
+            "side_data": side_results
+        }, 500, frame_fields=("front_data", "side_data"))
 
-        print(f"Processing front video {video_uri}")
-        try:
-            temp_file_path = f"/tmp/{os.path.basename(video_uri)}"
-            with open(temp_file_path, "wb") as f:
-                f.write(base64.b64decode(base64_data))
-            
-            ocr_result = ocr.analyze_video(temp_file_path)
-            print(f"Processed front video {video_uri} with data: {ocr_result}")
-            
-            if not ocr_result:
-                return jsonify({
-                    "message": "Failed to process front video",
-                    "video": video_uri,
-                    "data": None
-                }), 500
-            
-            front_results.append(ocr_result)
-        except Exception as e:
-            print(f"Error processing front video {video_uri}: {e}")
-            return jsonify({
-                "message": "Error during front video processing",
-                "video": video_uri,
-                "error": str(e)
-            }), 500
-        finally:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-
-    # Process side videos
-    for video in side_videos:
-        video_uri = video.get("videoUri")
-        base64_data = video.get("base64Data")
-        if not base64_data:
-            return jsonify({"message": "Missing base64 data for side video", "video": video_uri}), 400
-
-        print(f"Processing side video {video_uri}")
-        try:
-            temp_file_path = f"/tmp/{os.path.basename(video_uri)}"
-            with open(temp_file_path, "wb") as f:
-                f.write(base64.b64decode(base64_data))
-            
-            ocr_result = ocr.analyze_video(temp_file_path)
-            print(f"Processed side video {video_uri} with data: {ocr_result}")
-            
-            if not ocr_result:
-                return jsonify({
-                    "message": "Failed to process side video",
-                    "video": video_uri,
-                    "data": None
-                }), 500
-            
-            side_results.append(ocr_result)
-        except Exception as e:
-            print(f"Error processing side video {video_uri}: {e}")
-            return jsonify({
-                "message": "Error during side video processing",
-                "video": video_uri,
-                "error": str(e)
-            }), 500
-        finally:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-
-    return jsonify({
+    return encoded_response({
         "message": "Consistency videos processed successfully",
         "front_processed_count": len(front_videos),
         "side_processed_count": len(side_videos),
         "front_data": front_results,
         "side_data": side_results
-    }), 200
+    }, 200, frame_fields=("front_data", "side_data"))
     
+def submit_analysis_job(kind, groups):
+    profile, error = requested_profile()
+    if error:
+        return jsonify(error), 400
+    window, error = requested_window()
+    if error:
+        return jsonify(error), 400
+    job_dir = os.path.join(JOB_DIR, uuid.uuid4().hex)
+    os.makedirs(job_dir)
+    saved = {}
+    for name, (field, label) in groups.items():
+        _, paths, error = gather_videos(field, label, keep_dir=job_dir)
+        if error:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return jsonify(error), 400
+        saved[name] = paths
+    job_id = job_queue.submit(kind, {"kind": kind, "groups": saved, "dir": job_dir, "profile": profile,
+                                     "window": window})
+    return jsonify({
+        "message": "Job queued",
+        "jobId": job_id,
+        "status": "queued",
+        "statusUrl": f"/jobs/{job_id}"
+    }), 202
+
+@app.route("/jobs/process_videos", methods=["POST"])
+def submit_process_videos_job():
+    return submit_analysis_job("process_videos", {"data": ("videos", "video")})
+
+@app.route("/jobs/process_consistency_videos", methods=["POST"])
+def submit_process_consistency_videos_job():
+    return submit_analysis_job("process_consistency_videos", {
+        "front_data": ("frontVideos", "front video"),
+        "side_data": ("sideVideos", "side video")
+    })
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    # ?wait=<seconds> long-polls until the job finishes
+    wait = request.args.get("wait", type=float)
+    if wait:
+        job = job_queue.wait(job_id, min(wait, MAX_JOB_WAIT_SECONDS))
+    else:
+        job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"message": "Job not found"}), 404
+    # finished jobs carry the same body as the synchronous endpoints under "result"
+    return encoded_response(job, 200, frame_fields=("result.data", "result.front_data", "result.side_data"))
+
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,87 @@
+import argparse
+import time
+import numpy as np
+from angle_engine import arm_angles, front_angles
+from generate_side_bell_curves import calculate_angle
+
+
+def loop_arm_angles(shoulder, elbow, wrist, pinky, index):
+    # the per-frame loop process_arm_data used before the angle engine
+    angle_sew_list = []
+    angle_ewa_list = []
+    for s, e, w, p, idx in zip(shoulder, elbow, wrist, pinky, index):
+        angle_sew_list.append(calculate_angle(e, s, w))
+        avg_pinky_index = [(p[0] + idx[0]) / 2, (p[1] + idx[1]) / 2]
+        angle_ewa_list.append(calculate_angle(w, e, avg_pinky_index))
+    return np.array(angle_sew_list), np.array(angle_ewa_list)
+
+
+def loop_front_angles(hip, shoulder, left_elbow, right_elbow, wrist, pinky):
+    # the per-frame loop process_front_data used before the angle engine
+    hse_list, sew_list, ewp_list, ec_list = [], [], [], []
+    for h, s, le, re, w, p in zip(hip, shoulder, left_elbow, right_elbow, wrist, pinky):
+        hse_list.append(calculate_angle(s, h, le))
+        sew_list.append(calculate_angle(le, s, w))
+        ewp_list.append(calculate_angle(w, le, p))
+        length_left_arm = ((w[0] - le[0]) ** 2 + (w[1] - le[1]) ** 2) ** 0.5
+        ec_list.append(0.0 if length_left_arm == 0 else abs(le[1] - re[1]) / length_left_arm)
+    return np.array(hse_list), np.array(sew_list), np.array(ewp_list), np.array(ec_list)
+
+
+def random_joints(num_frames, num_joints, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 1920, size=(num_frames, 2)) for _ in range(num_joints)]
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def benchmark(num_frames, loop_limit):
+    """
+    Times the loop and vectorized versions on num_frames random frames.
+    Above loop_limit frames the loop, which takes minutes there, only runs on
+    the first loop_limit frames and its time is scaled up linearly (it does the
+    same work per frame); those rows are marked extrapolated.
+    Output:
+        list of (metrics, frames, loop seconds, vector seconds, extrapolated)
+    """
+    rows = []
+    cases = (
+        ("arm", loop_arm_angles, arm_angles, 5),
+        ("front", loop_front_angles, front_angles, 6),
+    )
+    for name, loop_version, vector_version, num_joints in cases:
+        joints = random_joints(num_frames, num_joints)
+        vector_seconds, vector_result = time_call(vector_version, *joints)
+        loop_frames = min(num_frames, loop_limit)
+        loop_seconds, loop_result = time_call(loop_version, *[j[:loop_frames].tolist() for j in joints])
+        for expected, actual in zip(loop_result, vector_result):
+            assert np.allclose(expected, actual[:loop_frames]), f"{name}: vectorized angles differ from the loop"
+        extrapolated = loop_frames < num_frames
+        if extrapolated:
+            loop_seconds *= num_frames / loop_frames
+        rows.append((name, num_frames, loop_seconds, vector_seconds, extrapolated))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loop vs vectorized angle computation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000])
+    parser.add_argument("--loop-limit", type=int, default=1_000_000,
+                        help="largest frame count to time the per-frame loop on; "
+                             "larger sizes extrapolate from this many frames")
+    args = parser.parse_args()
+
+    print(f"{'metrics':<8}{'frames':>12}{'loop (s)':>12}{'vector (s)':>12}{'speedup':>10}")
+    for num_frames in args.sizes:
+        for name, frames, loop_seconds, vector_seconds, extrapolated in benchmark(num_frames, args.loop_limit):
+            note = "  (loop extrapolated)" if extrapolated else ""
+            print(f"{name:<8}{frames:>12}{loop_seconds:>12.4f}{vector_seconds:>12.4f}"
+                  f"{loop_seconds / vector_seconds:>9.1f}x{note}")
+
+
+if __name__ == "__main__":
+    main()
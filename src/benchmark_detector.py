@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import time
+import cv2
+import recognition_model as ocr
+
+# a detection counts as a hit when its center is within this many pixels of the label
+DEFAULT_TOLERANCE = 30
+
+
+def load_manifest(path):
+    """
+    Labelled clip set, as JSON:
+        {"tolerance": 30,
+         "clips": [{"video": "clip.mp4", "balls": {"12": [x, y], "13": null, ...}}]}
+    balls maps frame indices to the labelled ball center, or null for frames where
+    the ball is not visible. Unlabelled frames are decoded but not scored.
+    Relative video paths are resolved against the manifest's directory.
+    """
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for clip in manifest["clips"]:
+        clip["video"] = os.path.join(base_dir, clip["video"])
+        clip["balls"] = {int(frame): ball for frame, ball in clip["balls"].items()}
+    return manifest
+
+
+def _read_frames(video_path):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    try:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    return frames
+
+
+def benchmark_profile(manifest, profile, batch_size=8):
+    """
+    Runs the profile's detector over every frame of every clip and scores the labelled ones.
+
+    Output:
+        {"profile", "frames", "fps", "recall", "false_positive_rate", "labelled_balls", "labelled_empty"}
+        recall = labelled balls found within tolerance / labelled balls
+        false_positive_rate = detections on frames labelled empty / frames labelled empty
+    """
+    tolerance = manifest.get("tolerance", DEFAULT_TOLERANCE)
+    ocr.get_detector(profile)  # load outside the timed section
+    frames_total = 0
+    detect_seconds = 0.0
+    hits = balls = false_positives = empty = 0
+    for clip in manifest["clips"]:
+        frames = _read_frames(clip["video"])
+        detections = []
+        for start in range(0, len(frames), batch_size):
+            started = time.perf_counter()
+            detections.extend(ocr.detect_balls(frames[start:start + batch_size], profile))
+            detect_seconds += time.perf_counter() - started
+        frames_total += len(frames)
+        for frame_index, label in clip["balls"].items():
+            found = detections[frame_index] if frame_index < len(detections) else None
+            if label is None:
+                empty += 1
+                false_positives += found is not None
+                continue
+            balls += 1
+            if found is not None and (found[0] - label[0]) ** 2 + (found[1] - label[1]) ** 2 <= tolerance ** 2:
+                hits += 1
+    return {
+        "profile": profile,
+        "frames": frames_total,
+        "fps": frames_total / detect_seconds if detect_seconds > 0 else 0.0,
+        "recall": hits / balls if balls else None,
+        "false_positive_rate": false_positives / empty if empty else None,
+        "labelled_balls": balls,
+        "labelled_empty": empty,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ball detection recall and speed per detector profile")
+    parser.add_argument("manifest", help="JSON manifest of labelled clips")
+    parser.add_argument("--profiles", nargs="+", default=list(ocr.DETECTOR_PROFILES))
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    print(f"{'profile':<10}{'frames':>8}{'fps':>10}{'recall':>9}{'false +':>9}")
+    for profile in args.profiles:
+        result = benchmark_profile(manifest, profile, args.batch_size)
+        recall = f"{result['recall']:.3f}" if result["recall"] is not None else "-"
+        false_rate = f"{result['false_positive_rate']:.3f}" if result["false_positive_rate"] is not None else "-"
+        print(f"{profile:<10}{result['frames']:>8}{result['fps']:>10.1f}{recall:>9}{false_rate:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import os
+import shutil
+import time
+import cv2
+import recognition_model as ocr
+from exported_detector import ExportedDetector, exported_path
+
+# formats ultralytics exports to, and the runtime that serves each
+FORMATS = {"onnx": "onnxruntime", "openvino": "openvino"}
+# largest ball center difference, in pixels, still counted as the same detection
+DEFAULT_TOLERANCE = 4
+
+
+def export(profile=None, fmt="onnx", output_dir="."):
+    """
+    Exports the profile's YOLO weights at the profile's imgsz with a fixed input
+    shape, and moves the result to where recognition_model looks for it.
+    Returns the exported model path.
+    """
+    from ultralytics import YOLO
+    _, settings = ocr.detector_profile(profile)
+    weights = settings["weights"]
+    exported = YOLO(weights).export(format=fmt, imgsz=settings["imgsz"], dynamic=False, verbose=False)
+    target = exported_path(weights, FORMATS[fmt], output_dir)
+    # openvino exports a directory holding the .xml, onnx a single file
+    destination = target if fmt == "onnx" else os.path.dirname(target)
+    if os.path.abspath(exported) != os.path.abspath(destination):
+        os.makedirs(output_dir, exist_ok=True)
+        if os.path.isdir(destination):
+            shutil.rmtree(destination)
+        elif os.path.exists(destination):
+            os.remove(destination)
+        shutil.move(exported, destination)
+    return target
+
+
+def _read_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            success, frame = cap.read()
+            if not success:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    return frames
+
+
+def _detect(detector, frames, imgsz):
+    started = time.perf_counter()
+    balls = [ocr._ball_from_result(detector(frame, conf=ocr.BALL_CONFIDENCE, iou=ocr.NMS_IOU,
+                                            imgsz=imgsz, augment=False, verbose=False)[0])
+             for frame in frames]
+    return balls, time.perf_counter() - started
+
+
+def verify(path, backend, video_path, profile=None, max_frames=100, tolerance=DEFAULT_TOLERANCE, num_threads=0):
+    """
+    Compares ball detections of the exported model against the PyTorch weights
+    on the first frames of a video. Both run without test-time augmentation at
+    the profile's imgsz, so any difference comes from the export.
+
+    Output:
+        {"frames", "agreement", "max_center_diff", "mismatched_frames", "pytorch_fps", "exported_fps"}
+        agreement = frames where both find no ball, or both find one within tolerance / frames
+    """
+    from ultralytics import YOLO
+    _, settings = ocr.detector_profile(profile)
+    frames = _read_frames(video_path, max_frames)
+    reference, reference_seconds = _detect(YOLO(settings["weights"]), frames, settings["imgsz"])
+    exported, exported_seconds = _detect(ExportedDetector(path, backend, settings["imgsz"], num_threads),
+                                         frames, settings["imgsz"])
+
+    mismatched = []
+    max_diff = 0.0
+    for index, (expected, actual) in enumerate(zip(reference, exported)):
+        if expected is None or actual is None:
+            if expected is not actual:
+                mismatched.append(index)
+            continue
+        diff = max(abs(expected[0] - actual[0]), abs(expected[1] - actual[1]))
+        max_diff = max(max_diff, diff)
+        if diff > tolerance:
+            mismatched.append(index)
+    return {
+        "frames": len(frames),
+        "agreement": 1 - len(mismatched) / len(frames) if frames else None,
+        "max_center_diff": max_diff,
+        "mismatched_frames": mismatched,
+        "pytorch_fps": len(frames) / reference_seconds if reference_seconds > 0 else 0.0,
+        "exported_fps": len(frames) / exported_seconds if exported_seconds > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the ball detector for ONNX Runtime or OpenVINO on CPU")
+    parser.add_argument("--profile", default=None, choices=list(ocr.DETECTOR_PROFILES))
+    parser.add_argument("--format", default="onnx", choices=list(FORMATS))
+    parser.add_argument("--output-dir", default=ocr.DETECTOR_EXPORT_DIR)
+    parser.add_argument("--verify", metavar="VIDEO", help="compare the export against PyTorch on this video")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+
+    path = export(args.profile, args.format, args.output_dir)
+    print(f"Exported {path}")
+    if args.verify:
+        result = verify(path, FORMATS[args.format], args.verify, args.profile, args.frames, args.tolerance, args.threads)
+        print(f"frames {result['frames']}, agreement {result['agreement']:.3f}, "
+              f"max center diff {result['max_center_diff']:.1f}px")
+        print(f"pytorch {result['pytorch_fps']:.1f} fps, {FORMATS[args.format]} {result['exported_fps']:.1f} fps")
+        if result["mismatched_frames"]:
+            print(f"mismatched frames: {result['mismatched_frames']}")
+
+
+if __name__ == "__main__":
+    main()
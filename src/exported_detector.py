@@ -0,0 +1,133 @@
+import functools
+import os
+import cv2
+import numpy as np
+
+# runtimes that can serve an exported detector, in the order "auto" tries them
+BACKENDS = ("openvino", "onnxruntime")
+PAD_VALUE = 114
+MAX_DETECTIONS = 300
+
+
+def exported_path(weights, backend, export_dir="."):
+    """Where export_detector.py writes the exported model for weights (same names as ultralytics)."""
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    if backend == "openvino":
+        return os.path.join(export_dir, f"{stem}_openvino_model", f"{stem}.xml")
+    return os.path.join(export_dir, f"{stem}.onnx")
+
+
+@functools.lru_cache(maxsize=None)
+def runtime_available(backend):
+    try:
+        if backend == "openvino":
+            import openvino  # noqa: F401
+        else:
+            import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def letterbox(frame, size):
+    """
+    Resizes frame to fit a size x size square keeping its aspect ratio and pads the
+    rest, like ultralytics does for square exported models.
+    Returns the (1, 3, size, size) float32 RGB input, the scale and the (left, top) padding.
+    """
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    pad_w, pad_h = (size - new_w) / 2, (size - new_h) / 2
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3)
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)[np.newaxis]
+    return np.ascontiguousarray(image, dtype=np.float32) / 255.0, scale, (left, top)
+
+
+class _Box:
+    # same fields _ball_from_result reads from an ultralytics box
+    def __init__(self, cls_id, conf, xyxy):
+        self.cls = [cls_id]
+        self.conf = [conf]
+        self.xyxy = [xyxy]
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def postprocess(output, frame_shape, scale, padding, conf=0.25, iou=0.45):
+    """
+    Turns one raw YOLO output (4 + num_classes, candidates) into boxes in frame
+    coordinates: best class per candidate, confidence filter, per-class NMS,
+    highest confidence first.
+    """
+    predictions = output.T
+    scores = predictions[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    keep = confidences > conf
+    if not keep.any():
+        return _Result([])
+    centers, confidences, class_ids = predictions[keep, :4], confidences[keep], class_ids[keep]
+
+    left, top = padding
+    h, w = frame_shape[:2]
+    x1 = np.clip((centers[:, 0] - centers[:, 2] / 2 - left) / scale, 0, w)
+    y1 = np.clip((centers[:, 1] - centers[:, 3] / 2 - top) / scale, 0, h)
+    x2 = np.clip((centers[:, 0] + centers[:, 2] / 2 - left) / scale, 0, w)
+    y2 = np.clip((centers[:, 1] + centers[:, 3] / 2 - top) / scale, 0, h)
+    rects = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+    kept = cv2.dnn.NMSBoxesBatched(rects.tolist(), confidences.tolist(), class_ids.tolist(), conf, iou)
+    kept = sorted(np.asarray(kept).ravel().tolist(), key=lambda i: -confidences[i])[:MAX_DETECTIONS]
+    return _Result([
+        _Box(int(class_ids[i]), float(confidences[i]), [float(x1[i]), float(y1[i]), float(x2[i]), float(y2[i])])
+        for i in kept
+    ])
+
+
+class ExportedDetector:
+    """
+    YOLO detector exported to ONNX (run with ONNX Runtime) or OpenVINO IR, callable
+    like an ultralytics model: detector(frame_or_frames, conf=, iou=) returns one
+    result per frame with .boxes in frame coordinates. Exported models run at a
+    fixed square imgsz and have no test-time augmentation, so augment is ignored.
+    num_threads = 0 leaves the runtime's default thread count.
+    """
+
+    def __init__(self, path, backend, imgsz=640, num_threads=0):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}")
+        self.path = path
+        self.backend = backend
+        self.imgsz = imgsz
+        self.num_threads = num_threads
+        if backend == "onnxruntime":
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+                options.inter_op_num_threads = 1
+            session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+            input_name = session.get_inputs()[0].name
+            self._infer = lambda image: session.run(None, {input_name: image})[0]
+        else:
+            import openvino
+            core = openvino.Core()
+            config = {"INFERENCE_NUM_THREADS": num_threads} if num_threads else {}
+            compiled = core.compile_model(core.read_model(path), "CPU", config)
+            self._infer = lambda image: compiled([image])[0]
+
+    def __call__(self, source, conf=0.25, iou=0.45, imgsz=None, augment=False, verbose=False):
+        frames = source if isinstance(source, list) else [source]
+        results = []
+        for frame in frames:
+            image, scale, padding = letterbox(frame, self.imgsz)
+            output = np.asarray(self._infer(image))[0]
+            results.append(postprocess(output, frame.shape, scale, padding, conf, iou))
+        return results
@@ -2,6 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 from scipy.stats import beta
+from angle_engine import front_angles
+from running_stats import beta_parameters
 
 NUM_CLIPS = 0
 
@@ -49,43 +51,8 @@ def process_front_data(hip, shoulder, left_elbow, right_elbow, wrist, pinky):
     Outputs:
         hse_array, sew_array, ewp_array, ec_array as numpy arrays.
     """
-    hse_list = []
-    sew_list = []
-    ewp_list = []
-    ec_list = []
-    
-    for i in range(len(hip)):
-        h = hip[i]
-        s = shoulder[i]
-        le = left_elbow[i]
-        re = right_elbow[i]
-        w = wrist[i]
-        p = pinky[i]
-        
-        # Hip-Shoulder-Elbow (hse): angle at shoulder using points: hip, shoulder, left_elbow.
-        angle_hse = calculate_angle(s, h, le)
-        hse_list.append(angle_hse)
-        
-        # Shoulder-Elbow-Wrist (sew): angle at left_elbow using points: shoulder, left_elbow, wrist.
-        angle_sew = calculate_angle(le, s, w)
-        sew_list.append(angle_sew)
-        
-        # Elbow-Wrist-Pinky (ewp): angle at wrist using points: left_elbow, wrist, pinky.
-        angle_ewp = calculate_angle(w, le, p)
-        ewp_list.append(angle_ewp)
-        
-        # Elbow Comparison (ec):
-        # Compute absolute difference in y-coordinate between left_elbow and right_elbow.
-        diff_y = abs(le[1] - re[1])
-        # Calculate length of left arm: distance between left_elbow and wrist.
-        length_left_arm = math.sqrt((w[0] - le[0])**2 + (w[1] - le[1])**2)
-        if length_left_arm == 0:
-            ec = 0.0
-        else:
-            ec = diff_y / length_left_arm
-        ec_list.append(ec)
-    
-    return np.array(hse_list), np.array(sew_list), np.array(ewp_list), np.array(ec_list)
+    # All frames are computed at once by the vectorized angle engine.
+    return front_angles(hip, shoulder, left_elbow, right_elbow, wrist, pinky)
 
 def calculate_distribution_parameters(angles, max_val=180):
     """
@@ -103,19 +70,7 @@ def calculate_distribution_parameters(angles, max_val=180):
             - alpha: Beta distribution alpha parameter
             - beta: Beta distribution beta parameter
     """
-    mean_val = float(np.mean(angles))
-    std_val = float(np.std(angles))
-    m_y = mean_val / max_val
-    s_y_sq = (std_val**2) / (max_val**2)
-    
-    if s_y_sq <= 0:
-        alpha = beta_val = 100
-    else:
-        factor = (m_y * (1 - m_y) / s_y_sq) - 1
-        alpha = m_y * factor
-        beta_val = (1 - m_y) * factor
-    
-    return {"mean": mean_val, "std": std_val, "alpha": alpha, "beta": beta_val}
+    return beta_parameters(float(np.mean(angles)), float(np.std(angles)), max_val)
 
 def generate_front_plot(dist_params_hse, dist_params_sew, dist_params_ewp, dist_params_ec, view_name="front", save_plot=True):
     """
@@ -1,5 +1,7 @@
 from scipy.stats import beta
 import math
+from angle_engine import front_angles
+from scoring import beta_scores, aggregate_scores, frame_column
 
 def calculate_angle(vertex, a, b):
     """
@@ -121,6 +123,36 @@ def compare_front(new_data, hse_params, sew_params, ewp_params, ec_params):
         "ec_score": score_ec
     }
 
+def compare_front_batch(frames, hse_params, sew_params, ewp_params, ec_params):
+    """
+    Batch version of compare_front: scores every frame of a clip at once.
+
+    Inputs:
+        frames : list of frame dicts in the compare_front format, or a dict mapping
+                 "hip", "shoulder", "left_elbow", "right_elbow", "wrist", "pinky"
+                 to (N, 2) coordinate arrays
+        hse_params, sew_params, ewp_params, ec_params: Beta distribution parameters,
+                 as for compare_front
+
+    Returns:
+        A dictionary with keys:
+          "hse_score", "sew_score", "ewp_score", "ec_score": numpy arrays with one score per frame,
+          "aggregates": clip-level statistics from scoring.aggregate_scores.
+    """
+    joints = [frame_column(frames, name)
+              for name in ("hip", "shoulder", "left_elbow", "right_elbow", "wrist", "pinky")]
+    angle_hse, angle_sew, angle_ewp, ec_value = front_angles(*joints)
+
+    scores = {
+        "hse_score": beta_scores(angle_hse, hse_params),
+        "sew_score": beta_scores(angle_sew, sew_params),
+        "ewp_score": beta_scores(angle_ewp, ewp_params),
+        # ec is already in [0,1], so no scaling is needed.
+        "ec_score": beta_scores(ec_value, ec_params, max_val=1.0),
+    }
+    scores["aggregates"] = aggregate_scores(scores)
+    return scores
+
 def main():
     # Dummy distribution parameters for front view angles.
     hse_params = {"mean": 30.0, "std": 4.0, "alpha": 1.5, "beta": 2.0}
@@ -2,6 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 from scipy.stats import beta
+from angle_engine import arm_angles
+from running_stats import beta_parameters
 
 NUM_CLIPS = 0
 
@@ -47,26 +49,8 @@ def process_arm_data(shoulder, elbow, wrist, pinky, index):
         angle_sew_list  = numpy array of angles for shoulder->elbow->wrist
         angle_ewa_list  = numpy array of angles for elbow->wrist->(avg of pinky and index)
     """
-    angle_sew_list = []
-    angle_ewa_list = []
-    
-    for i in range(len(shoulder)):
-        s = shoulder[i]
-        e = elbow[i]
-        w = wrist[i]
-        p = pinky[i]
-        idx = index[i]
-        
-        # Calculate the shoulder-elbow-wrist angle.
-        angle_sew = calculate_angle(e, s, w)
-        angle_sew_list.append(angle_sew)
-        
-        # Calculate the elbow-wrist angle using the average of pinky and index.
-        avg_pinky_index = [(p[0] + idx[0]) / 2, (p[1] + idx[1]) / 2]
-        angle_ewa = calculate_angle(w, e, avg_pinky_index)
-        angle_ewa_list.append(angle_ewa)
-    
-    return np.array(angle_sew_list), np.array(angle_ewa_list)
+    # All frames are computed at once by the vectorized angle engine.
+    return arm_angles(shoulder, elbow, wrist, pinky, index)
 
 def calculate_distribution_parameters(angles, max_val=180):
     """
@@ -84,19 +68,7 @@ def calculate_distribution_parameters(angles, max_val=180):
             - alpha: Beta distribution alpha parameter
             - beta: Beta distribution beta parameter
     """
-    mean_val = float(np.mean(angles))
-    std_val = float(np.std(angles))
-    m_y = mean_val / max_val
-    s_y_sq = (std_val**2) / (max_val**2)
-    
-    if s_y_sq <= 0:
-        alpha = beta_val = 100  # default, very peaked
-    else:
-        factor = (m_y * (1 - m_y) / s_y_sq) - 1
-        alpha = m_y * factor
-        beta_val = (1 - m_y) * factor
-    
-    return {"mean": mean_val, "std": std_val, "alpha": alpha, "beta": beta_val}
+    return beta_parameters(float(np.mean(angles)), float(np.std(angles)), max_val)
 
 def generate_plot(dist_params_sew, dist_params_ewa, arm_name, save_plot=True):
     """
@@ -1,5 +1,7 @@
 from scipy.stats import beta
 import math
+from angle_engine import arm_angles
+from scoring import beta_scores, aggregate_scores, frame_column
 
 def calculate_angle(vertex, a, b):
     """
@@ -85,6 +87,32 @@ def compare_arm(new_data, which_arm, sew_params, ewa_params):
         "ewa_score": score_ewa
     }
 
+def compare_arm_batch(frames, which_arm, sew_params, ewa_params):
+    """
+    Batch version of compare_arm: scores every frame of a clip at once.
+
+    Inputs:
+        frames    : list of frame dicts in the compare_arm format, or a dict mapping
+                    "<arm>_shoulder", "<arm>_elbow", ... to (N, 2) coordinate arrays
+        which_arm : string "left" or "right"
+        sew_params, ewa_params: Beta distribution parameters, as for compare_arm
+
+    Returns:
+        A dictionary with keys:
+          "sew_score", "ewa_score": numpy arrays with one score per frame,
+          "aggregates": clip-level statistics from scoring.aggregate_scores.
+    """
+    joints = [frame_column(frames, f"{which_arm}_{name}")
+              for name in ("shoulder", "elbow", "wrist", "pinky", "index")]
+    angle_sew, angle_ewa = arm_angles(*joints)
+
+    scores = {
+        "sew_score": beta_scores(angle_sew, sew_params),
+        "ewa_score": beta_scores(angle_ewa, ewa_params),
+    }
+    scores["aggregates"] = aggregate_scores(scores)
+    return scores
+
 def main():
     # Dummy distribution parameters for the left arm.
     left_sew_params = {"mean": 45.0, "std": 5.0, "alpha": 2.0, "beta": 3.0}
@@ -0,0 +1,205 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+# keep progress writes from hammering the database on long clips
+PROGRESS_INTERVAL = 0.5
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue served by a pool of worker processes.
+
+    submit() stores a job and returns its id right away; each worker claims
+    queued jobs one at a time and runs handler(payload, progress) on them,
+    where progress(done, total) updates the job's progress field. The
+    handler's return value must be JSON-serializable and becomes the job
+    result. Workers are forked, so the handler and everything it closes over
+    are inherited rather than pickled; initializer, if given, runs once in each
+    worker before it claims jobs. Call start() before the process starts
+    serving requests: forking from a threaded server can copy a lock another
+    thread holds into the worker. submit() only forks again if every worker
+    has died.
+    """
+
+    def __init__(self, db_path, handler, num_workers=2, poll_interval=0.2, initializer=None):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.db_path = db_path
+        self.handler = handler
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.initializer = initializer
+        self._context = multiprocessing.get_context("fork")
+        self._stop_event = self._context.Event()
+        self._workers = []
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " progress_done INTEGER NOT NULL DEFAULT 0,"
+                " progress_total INTEGER NOT NULL DEFAULT 0,"
+                " worker_pid INTEGER,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # Worker pool
+    def start(self):
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        if self._workers:
+            return
+        self.requeue_orphans()
+        self._stop_event.clear()
+        for _ in range(self.num_workers):
+            worker = self._context.Process(target=self._worker_loop, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout=10):
+        self._stop_event.set()
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def requeue_orphans(self):
+        """Puts jobs whose worker process died back in the queue."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, worker_pid FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+            for job_id, pid in rows:
+                if pid is None or not _pid_alive(pid):
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker_pid = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                        (QUEUED, time.time(), job_id, RUNNING),
+                    )
+
+    def _worker_loop(self):
+        if self.initializer is not None:
+            self.initializer()
+        while not self._stop_event.is_set():
+            job = self._claim()
+            if job is None:
+                self._stop_event.wait(self.poll_interval)
+                continue
+            job_id, payload = job
+            last_write = [0.0]
+
+            def progress(done, total):
+                now = time.monotonic()
+                if now - last_write[0] >= PROGRESS_INTERVAL or (total and done >= total):
+                    last_write[0] = now
+                    self._update(job_id, progress_done=int(done), progress_total=int(total))
+
+            try:
+                result = json.dumps(self.handler(payload, progress))
+            except Exception as error:
+                self._update(job_id, status=FAILED, error=str(error))
+            else:
+                self._update(job_id, status=DONE, result=result)
+
+    def _claim(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker_pid = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, os.getpid(), time.time(), row[0]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    # Client side
+    def submit(self, kind, payload):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(payload), now, now),
+            )
+        self.start()
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, result, error, progress_done, progress_total, created_at, updated_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = {
+            "jobId": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "progress": {"framesProcessed": row[5], "totalFrames": row[6]},
+            "createdAt": row[7],
+            "updatedAt": row[8],
+        }
+        if row[3] is not None:
+            job["result"] = json.loads(row[3])
+        if row[4] is not None:
+            job["error"] = row[4]
+        return job
+
+    def wait(self, job_id, timeout):
+        """Long-poll: returns the job once it has finished or timeout seconds have passed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
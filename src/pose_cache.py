@@ -0,0 +1,145 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# hit / miss / eviction counters, shared by every process using the directory
+COUNTERS_FILE = "counters"
+COUNTERS = ("hits", "misses", "evictions")
+
+
+class PoseCache:
+    """
+    Content-addressed on-disk store for analyze_video results.
+
+    Entries are keyed by the SHA-256 of the video bytes plus the model
+    settings, so the same clip analyzed with the same detector and thresholds
+    is only processed once. The directory is kept under max_bytes by evicting
+    the least recently used entries (file mtime is bumped on every hit).
+    The hit / miss / eviction counters are kept in the directory too, so
+    stats() covers the job worker processes as well as the server's.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _read_counters(self, f):
+        f.seek(0)
+        try:
+            counters = json.loads(f.read() or "{}")
+        except ValueError:
+            counters = {}
+        return {name: counters.get(name, 0) for name in COUNTERS}
+
+    def _count(self, **amounts):
+        # flock serializes processes, self._lock the threads of this one
+        with self._lock, open(os.path.join(self.directory, COUNTERS_FILE), "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            counters = self._read_counters(f)
+            for name, amount in amounts.items():
+                counters[name] += amount
+            f.seek(0)
+            f.truncate()
+            json.dump(counters, f)
+
+    def key_for(self, video, settings):
+        """
+        Inputs:
+            video    = path to the video file or its raw bytes
+            settings = JSON-serializable dict of everything that affects the result
+        Output:
+            hex digest identifying the (video, settings) pair
+        """
+        digest = hashlib.sha256()
+        if isinstance(video, (bytes, bytearray, memoryview)):
+            digest.update(video)
+        else:
+            with open(video, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                frames = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self._count(misses=1)
+            return None
+        self._count(hits=1)
+        return frames
+
+    def put(self, key, frames):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(frames, f)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _evict(self):
+        evicted = 0
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    info = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+        if evicted:
+            self._count(evictions=evicted)
+
+    def analysis_key(self, video, settings, **kwargs):
+        return self.key_for(video, {"model": settings, "options": kwargs})
+
+    def analyze(self, video, analyze_video, settings, progress=None, **kwargs):
+        """
+        Returns the cached frame list for video, or runs
+        analyze_video(video, **kwargs) and stores its result. kwargs are part
+        of the key because they change the output (stride, tracking, ...);
+        progress is only forwarded on a miss. Empty results are not stored,
+        since they usually mean the clip failed to decode.
+        """
+        key = self.analysis_key(video, settings, **kwargs)
+        frames = self.get(key)
+        if frames is not None:
+            return frames
+        if progress is not None:
+            kwargs["progress"] = progress
+        frames = analyze_video(video, **kwargs)
+        if frames:
+            self.put(key, frames)
+        return frames
+
+    def stats(self):
+        with self._lock, open(os.path.join(self.directory, COUNTERS_FILE), "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            counters = self._read_counters(f)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
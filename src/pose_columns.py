@@ -0,0 +1,170 @@
+import io
+import numpy as np
+
+# Same order as recognition_model.POSE_JOINTS
+JOINT_NAMES = (
+    "left_shoulder",
+    "right_shoulder",
+    "left_elbow",
+    "right_elbow",
+    "left_wrist",
+    "right_wrist",
+    "left_hip",
+    "right_hip",
+)
+
+# Joint states, replacing the per-frame "NONE" strings
+MISSING = 0   # key absent
+HIDDEN = 1    # "NONE": landmark below the visibility threshold
+VISIBLE = 2   # [x, y] coordinates
+NULL = 3      # key present with value None
+
+# Bits of the per-frame "present" column: which of "ball" / "time" the frame has
+HAS_BALL = 1
+HAS_TIME = 2
+
+
+class PoseColumns:
+    """
+    Columnar form of the per-frame list returned by analyze_video.
+
+    Instead of one dict per frame repeating every joint name, a clip is stored as
+        joints      (N, J, 2) int16 pixel coordinates (int32 if a value does not fit)
+        state       (N, J)    uint8 MISSING / HIDDEN / VISIBLE per joint
+        ball        (N, 2)    ball center, same dtype as joints
+        ball_found  (N,)      bool, False where the frame's ball is None or absent
+        time        (N,)      int32 frame index (the row number where absent)
+        present     (N,)      uint8 HAS_BALL | HAS_TIME bits for the keys the frame has
+    Coordinates of non-visible joints are 0. from_frames / to_frames convert
+    losslessly to and from the dict format, including absent keys and None values.
+    """
+
+    def __init__(self, joints, state, ball, ball_found, time, joint_names=JOINT_NAMES, present=None):
+        self.joints = joints
+        self.state = state
+        self.ball = ball
+        self.ball_found = ball_found
+        self.time = time
+        self.joint_names = tuple(joint_names)
+        # archives written before the column existed always had both keys
+        self.present = present if present is not None else np.full(len(time), HAS_BALL | HAS_TIME, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def nbytes(self):
+        arrays = (self.joints, self.state, self.ball, self.ball_found, self.time, self.present)
+        return sum(array.nbytes for array in arrays)
+
+    @classmethod
+    def from_frames(cls, frames, joint_names=JOINT_NAMES):
+        """
+        Inputs:
+            frames = list of frame dicts as returned by analyze_video
+        Raises ValueError for keys other than the joints, "ball" and "time",
+        since they could not be restored.
+        """
+        known = set(joint_names) | {"ball", "time"}
+        count = len(frames)
+        coords = np.zeros((count, len(joint_names), 2), dtype=np.int64)
+        state = np.zeros((count, len(joint_names)), dtype=np.uint8)
+        ball = np.zeros((count, 2), dtype=np.int64)
+        ball_found = np.zeros(count, dtype=bool)
+        time = np.zeros(count, dtype=np.int32)
+        present = np.zeros(count, dtype=np.uint8)
+
+        for row, frame in enumerate(frames):
+            unknown = set(frame) - known
+            if unknown:
+                raise ValueError(f"Frame {row} has keys that cannot be stored: {sorted(unknown)}")
+            for column, name in enumerate(joint_names):
+                if name not in frame:
+                    continue
+                value = frame[name]
+                if value is None:
+                    state[row, column] = NULL
+                elif value == "NONE":
+                    state[row, column] = HIDDEN
+                else:
+                    state[row, column] = VISIBLE
+                    coords[row, column] = value
+            if "ball" in frame:
+                present[row] |= HAS_BALL
+                if frame["ball"] is not None:
+                    ball_found[row] = True
+                    ball[row] = frame["ball"]
+            if "time" in frame:
+                present[row] |= HAS_TIME
+            time[row] = frame.get("time", row)
+
+        dtype = _coordinate_dtype(coords, ball)
+        return cls(coords.astype(dtype), state, ball.astype(dtype), ball_found, time, joint_names, present)
+
+    def to_frames(self):
+        """The analyze_video dict format, identical to what from_frames was given."""
+        joints = self.joints.tolist()
+        balls = self.ball.tolist()
+        present = self.present.tolist()
+        frames = []
+        for row, frame_state in enumerate(self.state.tolist()):
+            frame = {}
+            for column, name in enumerate(self.joint_names):
+                if frame_state[column] == VISIBLE:
+                    frame[name] = joints[row][column]
+                elif frame_state[column] == HIDDEN:
+                    frame[name] = "NONE"
+                elif frame_state[column] == NULL:
+                    frame[name] = None
+            if present[row] & HAS_BALL:
+                frame["ball"] = balls[row] if self.ball_found[row] else None
+            if present[row] & HAS_TIME:
+                frame["time"] = int(self.time[row])
+            frames.append(frame)
+        return frames
+
+    def to_bytes(self, compress=True):
+        """Serializes to an .npz archive (no pickled objects)."""
+        buffer = io.BytesIO()
+        save = np.savez_compressed if compress else np.savez
+        save(
+            buffer,
+            joints=self.joints,
+            state=self.state,
+            ball=self.ball,
+            ball_found=self.ball_found,
+            time=self.time,
+            present=self.present,
+            joint_names=np.array(self.joint_names),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return cls(
+                archive["joints"],
+                archive["state"],
+                archive["ball"],
+                archive["ball_found"],
+                archive["time"],
+                archive["joint_names"].tolist(),
+                archive["present"] if "present" in archive.files else None,
+            )
+
+    def save(self, path, compress=True):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(compress))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _coordinate_dtype(*arrays):
+    info = np.iinfo(np.int16)
+    for array in arrays:
+        if array.size and (array.min() < info.min or array.max() > info.max):
+            return np.int32
+    return np.int16
@@ -1,28 +1,303 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+import contextlib
+import os
+import queue
+import tempfile
+import threading
 import cv2
 import mediapipe as mp
-from ultralytics import YOLO
 import numpy as np
+from exported_detector import ExportedDetector, BACKENDS as EXPORTED_BACKENDS, exported_path, runtime_available
+from video_decoder import VideoDecoder, ThreadedDecoder
 
 # VISIBILITY_THRESHOLD = 0.5  # Set to 0.5 for now
-model = YOLO('yolo11x.pt')
+# Ball detector accuracy/speed trade-offs. augment=True is test-time augmentation,
+# which runs several inference passes per frame.
+DETECTOR_PROFILES = {
+    "fast": {"weights": "yolo11n.pt", "imgsz": 480, "augment": False},
+    "balanced": {"weights": "yolo11s.pt", "imgsz": 640, "augment": False},
+    "accurate": {"weights": "yolo11x.pt", "imgsz": 640, "augment": True},
+}
+# per-deployment default, overridable per call with profile=
+DEFAULT_PROFILE = os.getenv("DETECTOR_PROFILE", "accurate")
+if DEFAULT_PROFILE not in DETECTOR_PROFILES:
+    raise ValueError(f"DETECTOR_PROFILE must be one of {sorted(DETECTOR_PROFILES)}")
+MODEL_WEIGHTS = DETECTOR_PROFILES[DEFAULT_PROFILE]["weights"]
+# "pytorch", "onnxruntime", "openvino", or "auto" to use an export made by
+# export_detector.py when there is one in DETECTOR_EXPORT_DIR
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "auto")
+if DETECTOR_BACKEND not in ("auto", "pytorch") + EXPORTED_BACKENDS:
+    raise ValueError(f"DETECTOR_BACKEND must be auto, pytorch or one of {EXPORTED_BACKENDS}")
+DETECTOR_EXPORT_DIR = os.getenv("DETECTOR_EXPORT_DIR", ".")
+# inference threads of exported detectors, 0 for the runtime's default
+DETECTOR_THREADS = int(os.getenv("DETECTOR_THREADS", 0))
+BALL_CLASS_ID = 32 # COCO classID
+BALL_CONFIDENCE = 0.25 # low because balls are often blocked by the hand
+NMS_IOU = 0.45
+# when set, frames are resized once so their longer side is at most this many
+# pixels before pose estimation and ball detection. Cheaper on 1080p / 4K phone
+# clips, but joint and ball positions can move by a few pixels, so the default
+# 0 keeps the original size
+WORKING_MAX_SIDE = int(os.getenv("WORKING_MAX_SIDE", 0))
+POSE_SETTINGS = {
+    "static_image_mode": False,
+    "model_complexity": 1,
+    "smooth_landmarks": True,
+    "enable_segmentation": False,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+}
 
+# The detector is loaded on first use by get_detector() (or ahead of time by
+# warm_up()), so importing this module does not pay for reading the weights.
+# model is the default profile's detector; assigning a model here replaces it.
+model = None
+# detectors of the other profiles, by weights file
+_detectors = {}
+_model_lock = threading.Lock()
+# ultralytics predictors keep per-call state, so inference is serialized per process
+_inference_lock = threading.Lock()
+# seconds spent importing, loading and warming up, see model_load_report()
+load_times = {}
 
-def detect_ball(frame):
-    results = model(frame, conf=0.25, iou=0.45, augment=True, verbose=False)
-    ball = []
+# joints reported for every analyzed frame, in output order
+POSE_JOINTS = {
+    "left_shoulder": mp.solutions.pose.PoseLandmark.LEFT_SHOULDER,
+    "right_shoulder": mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
+    "left_elbow": mp.solutions.pose.PoseLandmark.LEFT_ELBOW,
+    "right_elbow": mp.solutions.pose.PoseLandmark.RIGHT_ELBOW,
+    "left_wrist": mp.solutions.pose.PoseLandmark.LEFT_WRIST,
+    "right_wrist": mp.solutions.pose.PoseLandmark.RIGHT_WRIST,
+    "left_hip": mp.solutions.pose.PoseLandmark.LEFT_HIP,
+    "right_hip": mp.solutions.pose.PoseLandmark.RIGHT_HIP,
+}
+
+
+def _ball_from_result(result):
+    for box in result.boxes:
+        cls_id = int(box.cls[0])
+        conf = float(box.conf[0])
+        if cls_id == BALL_CLASS_ID and conf > BALL_CONFIDENCE:
+            x1, y1, x2, y2 = box.xyxy[0]
+            x_center = (x1 + x2) / 2
+            y_center = (y1 + y2) / 2
+            return [int(x_center), int(y_center)]
+    return None
+
+
+def detector_profile(profile=None):
+    """Resolves a profile name (None means DEFAULT_PROFILE) to (name, settings)."""
+    name = profile or DEFAULT_PROFILE
+    if name not in DETECTOR_PROFILES:
+        raise ValueError(f"Unknown detector profile {name!r}, expected one of {sorted(DETECTOR_PROFILES)}")
+    return name, DETECTOR_PROFILES[name]
+
+
+def detector_backend(profile=None):
+    """
+    Returns (backend, model path) for a profile: the exported model when
+    DETECTOR_BACKEND asks for one (or is "auto" and an export exists whose
+    runtime is installed), otherwise ("pytorch", weights).
+    """
+    _, settings = detector_profile(profile)
+    weights = settings["weights"]
+    if DETECTOR_BACKEND == "pytorch":
+        return "pytorch", weights
+    candidates = EXPORTED_BACKENDS if DETECTOR_BACKEND == "auto" else (DETECTOR_BACKEND,)
+    for backend in candidates:
+        path = exported_path(weights, backend, DETECTOR_EXPORT_DIR)
+        if os.path.exists(path) and runtime_available(backend):
+            return backend, path
+    if DETECTOR_BACKEND != "auto":
+        raise FileNotFoundError(f"No usable {DETECTOR_BACKEND} export of {weights} in {DETECTOR_EXPORT_DIR}, "
+                                "see export_detector.py")
+    return "pytorch", weights
+
+
+def _load_detector(profile):
+    started = time.perf_counter()
+    backend, path = detector_backend(profile)
+    if backend == "pytorch":
+        from ultralytics import YOLO
+        detector = YOLO(path)
+    else:
+        detector = ExportedDetector(path, backend, detector_profile(profile)[1]["imgsz"], DETECTOR_THREADS)
+    load_times.setdefault("detector_load_seconds", time.perf_counter() - started)
+    return detector
+
+
+def get_detector(profile=None):
+    global model
+    _, settings = detector_profile(profile)
+    weights = settings["weights"]
+    if weights == MODEL_WEIGHTS:
+        if model is None:
+            with _model_lock:
+                if model is None:
+                    model = _load_detector(profile)
+        return model
+    if weights not in _detectors:
+        with _model_lock:
+            if weights not in _detectors:
+                _detectors[weights] = _load_detector(profile)
+    return _detectors[weights]
+
+
+def _drop_exported_detectors():
+    # exported runtimes keep their own thread pools, which do not survive fork
+    # and are sized when the session is created, so these are reloaded on next use
+    global model
+    if isinstance(model, ExportedDetector):
+        model = None
+    for weights, detector in list(_detectors.items()):
+        if isinstance(detector, ExportedDetector):
+            del _detectors[weights]
+
+
+def _run_model(source, profile=None, imgsz=None):
+    # imgsz below the profile's is used for small crops, which would otherwise
+    # be letterboxed up to the full input size
+    _, settings = detector_profile(profile)
+    detector = get_detector(profile)
+    with _inference_lock:
+        return detector(source, conf=BALL_CONFIDENCE, iou=NMS_IOU, imgsz=imgsz or settings["imgsz"],
+                        augment=settings["augment"], verbose=False)
+
+
+def crop_imgsz(crops, profile=None):
+    """
+    Inference size for a batch of crops: the largest crop side rounded up to
+    a multiple of 32 (YOLO's stride), at most the profile's imgsz.
+    """
+    _, settings = detector_profile(profile)
+    side = max(max(crop.shape[:2]) for crop in crops)
+    return min(settings["imgsz"], -(-side // 32) * 32)
+
+
+class _PosePool:
+    """
+    MediaPipe Pose graphs kept for reuse. A graph is reset between videos
+    instead of being rebuilt, so each worker builds at most one graph per video
+    it analyzes concurrently. The pool is emptied when the Pose class changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = []
+        self._factory = None
+        self.created = 0
+
+    def acquire(self):
+        factory = mp.solutions.pose.Pose
+        with self._lock:
+            if factory is not self._factory:
+                self._idle = []
+                self._factory = factory
+            if self._idle:
+                return self._idle.pop()
+        started = time.perf_counter()
+        pose = factory(**POSE_SETTINGS)
+        load_times.setdefault("pose_init_seconds", time.perf_counter() - started)
+        with self._lock:
+            self.created += 1
+        return pose
+
+    def release(self, pose):
+        # drops the tracking state of the previous video; a graph that cannot be reset is discarded
+        try:
+            pose.reset()
+        except Exception:
+            return
+        with self._lock:
+            if mp.solutions.pose.Pose is self._factory:
+                self._idle.append(pose)
+
+    def after_fork(self):
+        # the graphs' threads do not exist in a forked child, so they cannot be reused there
+        self._lock = threading.Lock()
+        self._idle = []
+        self._factory = None
+
+
+pose_pool = _PosePool()
+
+
+def _after_fork_in_child():
+    # Locks held by another thread at fork time would never be released in
+    # the child. A PyTorch detector is plain CPU tensors and stays shared.
+    global _model_lock, _inference_lock
+    _model_lock = threading.Lock()
+    _inference_lock = threading.Lock()
+    pose_pool.after_fork()
+    _drop_exported_detectors()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def warm_up(frame_size=(640, 640), profile=None):
+    """
+    Loads the detector and a Pose graph and runs one inference through each on a
+    blank frame, so the first real request does not pay for initialization.
+    Returns model_load_report().
+    """
+    started = time.perf_counter()
+    frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+    detect_ball(frame, profile)
+    pose = pose_pool.acquire()
+    try:
+        pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    finally:
+        pose_pool.release(pose)
+    load_times["warm_up_seconds"] = time.perf_counter() - started
+    return model_load_report()
+
+
+def model_load_report():
+    return {
+        **load_times,
+        "detector_loaded": model is not None,
+        "default_profile": DEFAULT_PROFILE,
+        "default_backend": detector_backend()[0],
+        "loaded_profile_weights": sorted(([MODEL_WEIGHTS] if model is not None else []) + list(_detectors)),
+        "pose_graphs": pose_pool.created,
+    }
+
+
+def detect_ball(frame, profile=None, imgsz=None):
+    results = _run_model(frame, profile, imgsz)
     for result in results:
-        boxes = result.boxes
-        for box in boxes:
-            cls_id = int(box.cls[0])
-            conf = float(box.conf[0])
-            if cls_id == 32 and conf > 0.25: # COCO classID
-                x1, y1, x2, y2 = box.xyxy[0]
-                x_center = (x1 + x2) / 2
-                y_center = (y1 + y2) / 2
-                ball.append([int(x_center), int(y_center)])
-    if len(ball) == 0:
-        return None
-    return ball[0]
+        ball = _ball_from_result(result)
+        if ball is not None:
+            return ball
+    return None
+
+
+def detect_balls(frames, profile=None, imgsz=None):
+    # one inference over the whole batch, results come back in input order
+    if len(frames) == 0:
+        return []
+    results = _run_model(list(frames), profile, imgsz)
+    return [_ball_from_result(result) for result in results]
+
+
+def model_settings(profile=None):
+    # everything that changes analyze_video output for the same clip
+    name, settings = detector_profile(profile)
+    return {
+        "profile": name,
+        "weights": settings["weights"],
+        "imgsz": settings["imgsz"],
+        "ball_class_id": BALL_CLASS_ID,
+        "ball_confidence": BALL_CONFIDENCE,
+        "nms_iou": NMS_IOU,
+        "augment": settings["augment"],
+        # exported models have no test-time augmentation, so their results differ
+        "backend": detector_backend(profile)[0],
+        "max_side": WORKING_MAX_SIDE,
+        "pose": POSE_SETTINGS,
+    }
 
 
 def get_landmark_xy(landmarks, index, image_width, image_height):
@@ -34,108 +309,530 @@ def get_landmark_xy(landmarks, index, image_width, image_height):
     y_coord = int((1 - landmark.y) * image_height)
     return [x_coord, y_coord]
 
-def analyze_video(video_path):
-    mp_drawing = mp.solutions.drawing_utils
-    mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(
-        static_image_mode=False,
-        model_complexity=1,
-        smooth_landmarks=True,
-        enable_segmentation=False,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-    cap = cv2.VideoCapture(video_path)
-    frame_index = 0
-    output_data = []
-
-    while cap.isOpened():
-        success, frame = cap.read()
-        if not success:
-            break
-
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(rgb_image)
-
-        # Convert back to BGR for consistent processing (even if not displayed)
-        annotated_image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
-
-        frame_data = {
-            "left_shoulder": None,
-            "right_shoulder": None,
-            "left_elbow": None,
-            "right_elbow": None,
-            "left_wrist": None,
-            "right_wrist": None,
-            "left_hip": None,
-            "right_hip": None,
-            "ball": None,
-            "time": frame_index
-        }
-
-        if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-            h, w, _ = frame.shape
-
-            left_shoulder = get_landmark_xy(landmarks, mp_pose.PoseLandmark.LEFT_SHOULDER.value, w, h)
-            right_shoulder = get_landmark_xy(landmarks, mp_pose.PoseLandmark.RIGHT_SHOULDER.value, w, h)
-            
-            left_elbow = get_landmark_xy(landmarks, mp_pose.PoseLandmark.LEFT_ELBOW.value, w, h)
-            right_elbow = get_landmark_xy(landmarks, mp_pose.PoseLandmark.RIGHT_ELBOW.value, w, h)
-
-            left_wrist = get_landmark_xy(landmarks, mp_pose.PoseLandmark.LEFT_WRIST.value, w, h)
-            right_wrist = get_landmark_xy(landmarks, mp_pose.PoseLandmark.RIGHT_WRIST.value, w, h)
-
-            left_hip = get_landmark_xy(landmarks, mp_pose.PoseLandmark.LEFT_HIP.value, w, h)
-            right_hip = get_landmark_xy(landmarks, mp_pose.PoseLandmark.RIGHT_HIP.value, w, h)
-
-            left_pinky = get_landmark_xy(landmarks, mp_pose.PoseLandmark.LEFT_PINKY.value, w, h)
-            right_pinky = get_landmark_xy(landmarks, mp_pose.PoseLandmark.RIGHT_PINKY.value, w, h)
-
-            ball = detect_ball(frame)
-            
+def extract_joints(landmarks, image_width, image_height):
+    return {
+        name: get_landmark_xy(landmarks, landmark.value, image_width, image_height)
+        for name, landmark in POSE_JOINTS.items()
+    }
+
+
+def ball_search_region(frame_shape, ball, joints, roi_size):
+    """
+    Returns the (x0, y0, x1, y1) crop that covers the last ball position and
+    the visible wrists with roi_size // 2 pixels of margin, or None when there
+    is nothing to track or the crop would be the whole frame anyway.
+    """
+    h, w = frame_shape[:2]
+    points = []
+    if ball is not None:
+        points.append(ball)
+    for name in ("left_wrist", "right_wrist"):
+        wrist = joints.get(name)
+        if isinstance(wrist, list):
+            # landmark y is measured from the bottom of the frame, ball y from the top
+            points.append([wrist[0], h - wrist[1]])
+    if not points:
+        return None
+    half = roi_size // 2
+    x0 = max(0, min(point[0] for point in points) - half)
+    y0 = max(0, min(point[1] for point in points) - half)
+    x1 = min(w, max(point[0] for point in points) + half)
+    y1 = min(h, max(point[1] for point in points) + half)
+    if x1 <= x0 or y1 <= y0 or (x1 - x0) * (y1 - y0) >= w * h:
+        return None
+    return x0, y0, x1, y1
+
+
+class _SamplingPolicy:
+    """
+    Decides which pose frames get a YOLO call: every stride-th frame, and every
+    frame for dense_frames frames after a wrist moves more than
+    motion_threshold pixels between two pose frames (the release).
+    """
+
+    def __init__(self, stride=1, motion_threshold=None, dense_frames=30):
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        if dense_frames < 0:
+            raise ValueError("dense_frames must not be negative")
+        self.stride = stride
+        self.motion_threshold = motion_threshold
+        self.dense_frames = dense_frames
+        self.last_sampled = None
+        self.dense_until = -1
+        self.last_wrists = {}
+
+    def _wrist_motion(self, joints):
+        motion = 0.0
+        for name in ("left_wrist", "right_wrist"):
+            wrist = joints.get(name)
+            if not isinstance(wrist, list):
+                continue
+            previous = self.last_wrists.get(name)
+            if previous is not None:
+                motion = max(motion, float(np.hypot(wrist[0] - previous[0], wrist[1] - previous[1])))
+            self.last_wrists[name] = wrist
+        return motion
+
+    def is_dense(self, frame_index):
+        return frame_index <= self.dense_until
+
+    def should_detect(self, frame_index, joints):
+        if self.motion_threshold is not None and self._wrist_motion(joints) >= self.motion_threshold:
+            self.dense_until = frame_index + self.dense_frames
+        if (self.is_dense(frame_index) or self.last_sampled is None
+                or frame_index - self.last_sampled >= self.stride):
+            self.last_sampled = frame_index
+            return True
+        return False
+
+
+class _DetectionStage:
+    """
+    Collects pose frames, runs ball detection on the ones the sampling policy
+    picks (batch_size frames per YOLO call) and builds the output frame dicts.
+    Ball positions of skipped frames are interpolated between the sampled
+    frames around them. With track_ball, detection first runs on a crop around
+    the last ball and the wrists, at an input size matching the crop, and only
+    falls back to the full frame when the crop has no ball. The crops of one
+    batch are all placed around the last ball of the previous batch, so with
+    batch_size > 1 the ball part of the search region lags by up to
+    batch_size frames (the wrists are always the frame's own).
+    """
+
+    def __init__(self, batch_size, policy=None, track_ball=False, roi_size=320, profile=None):
+        self.batch_size = batch_size
+        self.profile = profile
+        self.policy = policy or _SamplingPolicy()
+        self.track_ball = track_ball
+        self.roi_size = roi_size
+        self.last_ball = None
+        self.roi_detections = 0
+        self.roi_fallbacks = 0
+        # one [frame_index, joints, ball, sampled] record per pose frame
+        self.records = []
+        # (record, frame) waiting for ball detection
+        self.pending = []
+        # (record, frame) skipped since the last sample, detected late if a
+        # wrist trigger fires right after them
+        self.skipped = []
+        self.output_data = []
+        self.scale = (1.0, 1.0)
+        self.pose_frames = 0
+        self.detection_calls = 0
+        self.detect_seconds = 0.0
+
+    def add(self, frame_index, joints, frame, scale=(1.0, 1.0)):
+        # frame is the working frame, joints are in original pixels and
+        # scale maps working pixels back to them (see video_decoder.working_frame)
+        self.scale = scale
+        self.pose_frames += 1
+        record = [frame_index, joints, None, False]
+        self.records.append(record)
+        if not self.policy.should_detect(frame_index, joints):
+            self.skipped.append((record, frame))
+            return
+        if self.policy.is_dense(frame_index):
+            self.pending.extend(self.skipped)
+        self.skipped = []
+        self.pending.append((record, frame))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def _run_detector(self, frames, imgsz=None):
+        self.detection_calls += 1
+        if len(frames) == 1:
+            return [detect_ball(frames[0], self.profile, imgsz)]
+        return detect_balls(frames, self.profile, imgsz)
+
+    def _working_points(self, joints):
+        # last ball and wrists in working pixels; both scale linearly, also
+        # the wrists' bottom-up y
+        sx, sy = self.scale
+        ball = None if self.last_ball is None else [self.last_ball[0] / sx, self.last_ball[1] / sy]
+        wrists = {}
+        for name in ("left_wrist", "right_wrist"):
+            wrist = joints.get(name)
+            if isinstance(wrist, list):
+                wrists[name] = [wrist[0] / sx, wrist[1] / sy]
+        return ball, wrists
+
+    def _detect_tracked(self, frames):
+        balls = [None] * len(frames)
+        crops = []
+        roi_size = max(1, int(round(self.roi_size / self.scale[0])))
+        for position, ((record, _), frame) in enumerate(zip(self.pending, frames)):
+            ball, wrists = self._working_points(record[1])
+            region = ball_search_region(frame.shape, ball, wrists, roi_size)
+            if region is not None:
+                x0, y0, x1, y1 = (int(value) for value in region)
+                crops.append((position, frame[y0:y1, x0:x1], x0, y0))
+        if crops:
+            images = [crop for _, crop, _, _ in crops]
+            found = self._run_detector(images, crop_imgsz(images, self.profile))
+            for (position, _, x0, y0), ball in zip(crops, found):
+                if ball is not None:
+                    # back to full-frame pixel space
+                    balls[position] = [ball[0] + x0, ball[1] + y0]
+                    self.roi_detections += 1
+
+        lost = [position for position, ball in enumerate(balls) if ball is None]
+        if lost:
+            found = self._run_detector([frames[position] for position in lost])
+            for position, ball in zip(lost, found):
+                balls[position] = ball
+            self.roi_fallbacks += len(lost)
+        return balls
+
+    def flush(self):
+        if not self.pending:
+            return
+        frames = [frame for _, frame in self.pending]
+        detect_started = time.perf_counter()
+        if self.track_ball:
+            balls = self._detect_tracked(frames)
+        else:
+            balls = self._run_detector(frames)
+        self.detect_seconds += time.perf_counter() - detect_started
+        if self.scale != (1.0, 1.0):
+            sx, sy = self.scale
+            balls = [None if ball is None else [int(round(ball[0] * sx)), int(round(ball[1] * sy))] for ball in balls]
+        # a batch ending on a miss keeps the last ball it did find
+        self.last_ball = next((ball for ball in reversed(balls) if ball is not None), self.last_ball)
+        for (record, _), ball in zip(self.pending, balls):
+            record[2] = ball
+            record[3] = True
+        self.pending.clear()
+
+    def finish(self):
+        self.flush()
+        self.skipped = []
+        self.records.sort(key=lambda record: record[0])
+        self.sampled_frames = sum(1 for record in self.records if record[3])
+        self.interpolated_frames = 0
+        following = None
+        next_sampled = [None] * len(self.records)
+        for position in range(len(self.records) - 1, -1, -1):
+            next_sampled[position] = following
+            if self.records[position][3]:
+                following = self.records[position]
+        previous = None
+        for position, record in enumerate(self.records):
+            if record[3]:
+                previous = record
+                continue
+            following = next_sampled[position]
+            if previous is None or following is None or previous[2] is None or following[2] is None:
+                continue
+            weight = (record[0] - previous[0]) / (following[0] - previous[0])
+            record[2] = [
+                int(round(previous[2][0] + (following[2][0] - previous[2][0]) * weight)),
+                int(round(previous[2][1] + (following[2][1] - previous[2][1]) * weight)),
+            ]
+            self.interpolated_frames += 1
+
+        self.output_data = []
+        for frame_index, joints, ball, _ in self.records:
             if ball is not None:
-                frame_data = {
-                    "left_shoulder": left_shoulder,
-                    "right_shoulder": right_shoulder,
-                    "left_elbow": left_elbow,
-                    "right_elbow": right_elbow,
-                    "left_wrist": left_wrist,
-                    "right_wrist": right_wrist,
-                    "left_hip": left_hip,
-                    "right_hip": right_hip,
-                    # can take mean for waist value
-                    "ball": ball,
-                    "time": frame_index
-                }
-                output_data.append(frame_data)
-
-            # Landmark drawing commented out for server use it is for debugging purpose
-            # mp_drawing.draw_landmarks(
-            #     annotated_image,
-            #     results.pose_landmarks,
-            #     mp_pose.POSE_CONNECTIONS,
-            #     mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=4),
-            #     mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
-            # )
-            # if ball_boxes is not None:
-            #     for b in ball_boxes:
-            #         center = b['center']
-            #         cv2.circle(annotated_image, center, 5, (0, 255, 255), -1)
-
-        # Display commented out for server use
-        # cv2.imshow('Pose Detection', annotated_image)
-
-        frame_index += 1
+                frame_data = dict(joints)
+                # can take mean for waist value
+                frame_data["ball"] = ball
+                frame_data["time"] = frame_index
+                self.output_data.append(frame_data)
+        return self.output_data
+
+
+def _pose_joints(pose, frame, scale=(1.0, 1.0)):
+    results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    if not results.pose_landmarks:
+        return None
+    landmarks = results.pose_landmarks.landmark
+    # landmarks are normalized, so they map straight onto the original frame size
+    h, w = frame.shape[:2]
+    return extract_joints(landmarks, int(round(w * scale[0])), int(round(h * scale[1])))
+
+
+def _copy_video(video, f):
+    if isinstance(video, (bytes, bytearray, memoryview)):
+        f.write(video)
+        return
+    for chunk in iter(lambda: video.read(1024 * 1024), b""):
+        f.write(chunk)
+
+
+@contextlib.contextmanager
+def video_source(video):
+    """
+    Yields a path cv2.VideoCapture can open. Paths are used as they are;
+    bytes and binary file-like objects are copied into an anonymous in-memory
+    file (memfd) so they never touch the disk. Where memfd is not available a
+    uniquely named temp file is used instead.
+    """
+    if isinstance(video, (str, os.PathLike)):
+        yield os.fspath(video)
+        return
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("shotmatch_video", 0)
+        try:
+            with os.fdopen(fd, "wb", closefd=False) as f:
+                _copy_video(video, f)
+            yield f"/proc/self/fd/{fd}"
+        finally:
+            os.close(fd)
+        return
+    with tempfile.NamedTemporaryFile(prefix="shotmatch_video_", suffix=".mp4") as f:
+        _copy_video(video, f)
+        f.flush()
+        yield f.name
+
+
+def _run_sequential(decoder, pose, detection, report):
+    frames_done = 0
+    for frame_index, frame, scale in decoder:
+        joints = _pose_joints(pose, frame, scale)
+        if joints is not None:
+            detection.add(frame_index, joints, frame, scale)
+
+        frames_done += 1
+        report(frames_done)
         # Break key commented out for server use
         # if cv2.waitKey(1) & 0xFF == 27:
         #     break
 
-    cap.release()
-    # Window cleanup commented out
-    # cv2.destroyAllWindows()
-    
-    return output_data
+    detection.finish()
+    return frames_done
+
+
+_END_OF_STREAM = object()
+
+
+class _PipelineQueue:
+    """Bounded queue that remembers the deepest it got and gives up once the pipeline stops."""
+
+    def __init__(self, maxsize, stop_event):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.stop_event = stop_event
+        self.max_depth = 0
+
+    def put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+            return True
+        return False
+
+    def get(self):
+        while not self.stop_event.is_set():
+            try:
+                return self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END_OF_STREAM
+
+
+def _run_pipelined(decoder, pose, detection, report, queue_size, stage_seconds, queue_depths):
+    stop_event = threading.Event()
+    frame_queue = _PipelineQueue(queue_size, stop_event)
+    pose_queue = _PipelineQueue(queue_size, stop_event)
+    errors = []
+    decoded = [0]
+    frames_done = [0]
+
+    def run_stage(body, downstream):
+        try:
+            body()
+        except Exception as error:
+            errors.append(error)
+            stop_event.set()
+        finally:
+            if downstream is not None:
+                downstream.put(_END_OF_STREAM)
+
+    def decode():
+        try:
+            for item in decoder:
+                if not frame_queue.put(item):
+                    return
+                decoded[0] += 1
+        finally:
+            stage_seconds["decode"] = decoder.decode_seconds
+
+    def pose_stage():
+        while True:
+            item = frame_queue.get()
+            if item is _END_OF_STREAM:
+                return
+            frame_index, frame, scale = item
+            started = time.perf_counter()
+            joints = _pose_joints(pose, frame, scale)
+            stage_seconds["pose"] += time.perf_counter() - started
+            frames_done[0] += 1
+            report(frames_done[0])
+            if joints is not None and not pose_queue.put((frame_index, joints, frame, scale)):
+                return
+
+    def detect_stage():
+        while True:
+            item = pose_queue.get()
+            if item is _END_OF_STREAM:
+                break
+            detection.add(*item)
+        # the collector orders everything by frame index
+        detection.finish()
+        stage_seconds["detect"] = detection.detect_seconds
+
+    stages = [
+        threading.Thread(target=run_stage, args=(decode, frame_queue), daemon=True),
+        threading.Thread(target=run_stage, args=(pose_stage, pose_queue), daemon=True),
+        threading.Thread(target=run_stage, args=(detect_stage, None), daemon=True),
+    ]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+
+    queue_depths["frames"] = frame_queue.max_depth
+    queue_depths["pose"] = pose_queue.max_depth
+    if errors:
+        raise errors[0]
+    return decoded[0]
+
+
+def analyze_video(video_path, batch_size=1, pipeline=False, queue_size=32,
+                  stride=1, motion_threshold=None, dense_frames=30,
+                  track_ball=False, roi_size=320, progress=None, stats=None, profile=None, max_side=None,
+                  start=None, end=None, decode_thread=False, decode_threads=None, hw_acceleration=None):
+    """
+    batch_size > 1 buffers that many pose frames and runs a single YOLO call
+    over them. stride > 1 only runs detection on every stride-th pose frame;
+    with motion_threshold set, a wrist moving at least that many pixels
+    between pose frames switches to detecting every frame for dense_frames
+    frames. Ball positions on skipped frames are interpolated between the
+    detections around them. track_ball=True runs detection on a roi_size
+    margin crop around the previous ball and the wrists first and falls back
+    to the full frame when the ball is lost. profile picks one of DETECTOR_PROFILES
+    (default DEFAULT_PROFILE). Each frame is downscaled once so its longer side is at
+    most max_side pixels (default WORKING_MAX_SIDE, 0 for full resolution) and that
+    frame feeds both models; joint, ball and roi_size pixels are always in the
+    original frame's coordinates. start / end (seconds) limit the analysis to that
+    window of the video: decoding seeks straight to start and stops at end, and
+    "time" stays the frame index in the whole video. decode_threads and
+    hw_acceleration ("none" / "any") configure the decoder (defaults DECODE_THREADS
+    and VIDEO_HW_ACCELERATION); decode_thread=True decodes in a background thread
+    ahead of pose estimation. pipeline=True runs decoding, pose estimation and ball detection
+    in their own threads connected by queues of at most queue_size items; the
+    result is the same as the sequential path. video_path may also be the
+    video's bytes or a binary file-like object, which are decoded from memory
+    (see video_source). progress, if given, is called
+    as progress(frames_processed, total_frames) after every frame. If a stats dict is given it is
+    filled with frame counts and timings (frames/sec overall and for the
+    detection step, plus queue depths and stage times for the pipeline).
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if queue_size < 1:
+        raise ValueError("queue_size must be at least 1")
+    if roi_size < 1:
+        raise ValueError("roi_size must be at least 1")
+    profile, _ = detector_profile(profile)
+    if max_side is None:
+        max_side = WORKING_MAX_SIDE
+    detection = _DetectionStage(batch_size, _SamplingPolicy(stride, motion_threshold, dense_frames),
+                                track_ball=track_ball, roi_size=roi_size, profile=profile)
+    stage_seconds = {"decode": 0.0, "pose": 0.0, "detect": 0.0}
+    queue_depths = {}
+    started = time.perf_counter()
+
+    with video_source(video_path) as source:
+        decoder = VideoDecoder(source, start, end, max_side, decode_threads, hw_acceleration)
+        total_frames = decoder.frame_count() if progress is not None else 0
+
+        def report(frames_done):
+            if progress is not None:
+                progress(frames_done, total_frames)
+
+        pose = pose_pool.acquire()
+        try:
+            if pipeline:
+                # the pipeline already decodes in its own thread
+                frames = _run_pipelined(decoder, pose, detection, report, queue_size, stage_seconds, queue_depths)
+            elif decode_thread:
+                threaded = ThreadedDecoder(decoder, queue_size)
+                frames = _run_sequential(threaded, pose, detection, report)
+                queue_depths["frames"] = threaded.max_depth
+            else:
+                frames = _run_sequential(decoder, pose, detection, report)
+        finally:
+            decoder.release()
+            pose_pool.release(pose)
+            # Window cleanup commented out
+            # cv2.destroyAllWindows()
+
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        stats.update({
+            "profile": profile,
+            "max_side": max_side,
+            "working_scale": detection.scale,
+            "first_frame": decoder.first_frame,
+            "decode_seconds": decoder.decode_seconds,
+            "batch_size": batch_size,
+            "frames": frames,
+            "pose_frames": detection.pose_frames,
+            "ball_frames": len(detection.output_data),
+            "sampled_frames": detection.sampled_frames,
+            "skipped_frames": detection.pose_frames - detection.sampled_frames,
+            "interpolated_frames": detection.interpolated_frames,
+            "detection_calls": detection.detection_calls,
+            "roi_detections": detection.roi_detections,
+            "roi_fallbacks": detection.roi_fallbacks,
+            "detect_seconds": detection.detect_seconds,
+            "elapsed_seconds": elapsed,
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+            "detect_fps": detection.sampled_frames / detection.detect_seconds if detection.detect_seconds > 0 else 0.0,
+        })
+        if pipeline or decode_thread:
+            stats["queue_max_depth"] = queue_depths
+        if pipeline:
+            stats["stage_seconds"] = stage_seconds
+
+    return detection.output_data
+
+
+def set_num_threads(num_threads):
+    # used by worker processes so several analyses do not oversubscribe the CPU
+    global DETECTOR_THREADS
+    import torch
+    cv2.setNumThreads(num_threads)
+    torch.set_num_threads(num_threads)
+    DETECTOR_THREADS = num_threads
+    _drop_exported_detectors()
+
+
+def count_frames(video_path, start=None, end=None):
+    # frames analyze_video decodes for the same start / end
+    with video_source(video_path) as source:
+        decoder = VideoDecoder(source, start, end)
+        try:
+            return decoder.frame_count()
+        finally:
+            decoder.release()
+
+
+def benchmark_detection(video_path, batch_sizes=(1, 4, 8, 16)):
+    # runs the same clip once per batch size so the per-frame path (1) and the
+    # batched paths can be compared on the current machine
+    report = {}
+    for batch_size in batch_sizes:
+        stats = {}
+        analyze_video(video_path, batch_size=batch_size, stats=stats)
+        report[batch_size] = stats
+    return report
+
+load_times["import_seconds"] = time.perf_counter() - _IMPORT_STARTED
 
 # example usage:
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import numpy as np
+from scoring import beta_scores
+
+# Value each metric is divided by to scale it to [0,1]: angles are in degrees, ec is already a ratio.
+METRIC_SCALES = {"sew": 180.0, "ewa": 180.0, "hse": 180.0, "ewp": 180.0, "ec": 1.0}
+DEFAULT_RESOLUTION = 4096
+# points per table cell at which the interpolation error is measured
+OVERSAMPLE = 16
+
+
+class ReferenceProfile:
+    """
+    Compiled reference distributions for fast scoring.
+
+    For every metric the score curve (BetaPDF(x) / BetaPDF(mean)) * 100, clamped
+    to [0, 100], is tabulated once on resolution + 1 evenly spaced points of [0,1].
+    Scoring is then a table lookup with linear interpolation instead of a scipy
+    call, and gives the same results as scoring.beta_scores up to error_bounds.
+
+    params is a dict mapping metric names ("sew", "ewa", "hse", "ewp", "ec") to the
+    output of calculate_distribution_parameters for that metric.
+    """
+
+    def __init__(self, params, resolution=DEFAULT_RESOLUTION, tolerance=None):
+        if resolution < 1:
+            raise ValueError("resolution must be at least 1")
+        unknown = set(params) - set(METRIC_SCALES)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+        self.params = dict(params)
+        self.resolution = resolution
+        self.grid = np.linspace(0.0, 1.0, resolution + 1)
+        self.tables = {}
+        self.error_bounds = {}
+        for metric, metric_params in self.params.items():
+            self.tables[metric] = beta_scores(self.grid * METRIC_SCALES[metric], metric_params,
+                                              max_val=METRIC_SCALES[metric])
+            self.error_bounds[metric] = self._measure_error(metric)
+        if tolerance is not None:
+            worst = max(self.error_bounds.values(), default=0.0)
+            if worst > tolerance:
+                raise ValueError(
+                    f"Interpolation error {worst:.3g} exceeds tolerance {tolerance:.3g}; "
+                    "use a higher resolution"
+                )
+
+    def _measure_error(self, metric):
+        # Compares the exact scores with the interpolated ones at OVERSAMPLE points
+        # inside every cell (the error peaks anywhere between table points, and
+        # jumps near the kinks where scores are clamped at 100). The largest change
+        # between neighbouring samples is added as a margin for the error between them.
+        fractions = np.arange(OVERSAMPLE + 1) / OVERSAMPLE
+        cell_width = 1.0 / self.resolution
+        points = (self.grid[:-1, np.newaxis] + fractions * cell_width).ravel()
+        scale = METRIC_SCALES[metric]
+        exact = beta_scores(points * scale, self.params[metric], max_val=scale).reshape(-1, OVERSAMPLE + 1)
+        table = self.tables[metric]
+        approx = table[:-1, np.newaxis] + (table[1:] - table[:-1])[:, np.newaxis] * fractions
+        error = np.abs(exact - approx)
+        margin = np.max(np.abs(np.diff(error, axis=1)))
+        return float(np.max(error) + margin)
+
+    def score(self, metric, values):
+        """
+        Inputs:
+            metric = metric name, e.g. "sew"
+            values = array of raw metric values (degrees for angles, ratio for ec)
+        Output:
+            numpy array of scores in [0, 100]; 0 outside the support of the distribution
+        """
+        # The grid is uniform, so the table cell is found by scaling rather than searching.
+        position = np.asarray(values, dtype=np.float64) * (self.resolution / METRIC_SCALES[metric])
+        outside = ~((position >= 0) & (position <= self.resolution))
+        position = np.where(outside, 0.0, position)
+        cell = np.minimum(position.astype(np.intp), self.resolution - 1)
+        fraction = position - cell
+        table = self.tables[metric]
+        scores = table[cell] + (table[cell + 1] - table[cell]) * fraction
+        return np.where(outside, 0.0, scores)
+
+    def score_all(self, values_by_metric):
+        """Scores several metrics at once: {"sew": values, ...} -> {"sew_score": scores, ...}."""
+        return {f"{metric}_score": self.score(metric, values) for metric, values in values_by_metric.items()}
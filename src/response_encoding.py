@@ -0,0 +1,154 @@
+import gzip
+import json
+import threading
+import time
+from flask import Response, request
+from pose_columns import PoseColumns
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used instead
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # optional, JSON is used instead
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/x-msgpack"
+# bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def available_mimetypes():
+    return [JSON_MIMETYPE] + ([MSGPACK_MIMETYPE, "application/msgpack"] if msgpack is not None else [])
+
+
+def available_encodings():
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def columnar_clip(frames):
+    """
+    Compact form of one clip's frame list for binary responses: the PoseColumns
+    arrays as raw little-endian bytes, which the client can view directly as
+    typed arrays (Int16Array / Uint8Array / Int32Array) of the given shapes.
+    """
+    if frames is None:
+        return None
+    columns = PoseColumns.from_frames(frames)
+    return {
+        "format": "columns",
+        "count": len(columns),
+        "jointNames": list(columns.joint_names),
+        "coordinateType": columns.joints.dtype.name,
+        "joints": columns.joints.astype(columns.joints.dtype.newbyteorder("<")).tobytes(),
+        "state": columns.state.tobytes(),
+        "ball": columns.ball.astype(columns.ball.dtype.newbyteorder("<")).tobytes(),
+        "ballFound": columns.ball_found.astype("u1").tobytes(),
+        "time": columns.time.astype("<i4").tobytes(),
+        "present": columns.present.tobytes(),
+    }
+
+
+def _with_columnar_field(body, path):
+    # copy of body with the list of clips at the dotted path in columnar form
+    name, _, rest = path.partition(".")
+    if not isinstance(body, dict) or body.get(name) is None:
+        return body
+    packed = dict(body)
+    if rest:
+        packed[name] = _with_columnar_field(body[name], rest)
+    else:
+        packed[name] = [columnar_clip(frames) for frames in body[name]]
+    return packed
+
+
+def encode_body(body, mimetype, frame_fields=()):
+    """
+    Serializes a response body. For msgpack, every list of clips under frame_fields
+    (e.g. "data", or "result.data" for a field of a nested object) is sent in
+    columnar form; JSON keeps the frame dicts as they are.
+    """
+    if mimetype == JSON_MIMETYPE:
+        return json.dumps(body, separators=(",", ":")).encode("utf-8")
+    packed = body
+    for field in frame_fields:
+        packed = _with_columnar_field(packed, field)
+    return msgpack.packb(packed, use_bin_type=True)
+
+
+def compress(payload, encoding):
+    if encoding == "br":
+        return brotli.compress(payload, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(payload, compresslevel=GZIP_LEVEL)
+    return payload
+
+
+class ResponseMetrics:
+    """Running totals of response sizes and encode times, per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, endpoint, uncompressed_bytes, response_bytes, encode_seconds):
+        with self._lock:
+            totals = self._totals.setdefault(endpoint, {
+                "responses": 0, "uncompressed_bytes": 0, "response_bytes": 0, "encode_seconds": 0.0,
+            })
+            totals["responses"] += 1
+            totals["uncompressed_bytes"] += uncompressed_bytes
+            totals["response_bytes"] += response_bytes
+            totals["encode_seconds"] += encode_seconds
+
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for endpoint, totals in self._totals.items():
+                stats[endpoint] = dict(totals)
+                stats[endpoint]["compression_ratio"] = (
+                    totals["uncompressed_bytes"] / totals["response_bytes"] if totals["response_bytes"] else 0.0
+                )
+            return stats
+
+
+response_metrics = ResponseMetrics()
+
+
+def encoded_response(body, status=200, frame_fields=()):
+    """
+    Builds the response for the current request, negotiating the body format from
+    Accept (JSON, or msgpack when installed) and the compression from
+    Accept-Encoding (brotli when installed, then gzip). The encoded size and the
+    time spent encoding are reported in headers and in response_metrics.
+    The Expo app does not ask for msgpack, so it gets compressed JSON; the binary
+    format is only used by clients that send Accept: application/x-msgpack.
+    """
+    start = time.perf_counter()
+    mimetype = request.accept_mimetypes.best_match(available_mimetypes(), default=JSON_MIMETYPE)
+    if mimetype != JSON_MIMETYPE:
+        mimetype = MSGPACK_MIMETYPE
+    payload = encode_body(body, mimetype, frame_fields)
+    uncompressed_bytes = len(payload)
+
+    encoding = None
+    if uncompressed_bytes >= COMPRESS_MIN_BYTES:
+        encoding = request.accept_encodings.best_match(available_encodings())
+        payload = compress(payload, encoding)
+    encode_seconds = time.perf_counter() - start
+
+    response = Response(payload, status=status, mimetype=mimetype)
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    response.headers["X-Response-Bytes"] = str(len(payload))
+    response.headers["X-Uncompressed-Bytes"] = str(uncompressed_bytes)
+    response.headers["X-Encode-Time-Ms"] = f"{encode_seconds * 1000:.2f}"
+    response.headers["Server-Timing"] = f"encode;dur={encode_seconds * 1000:.2f}"
+    response_metrics.record(request.endpoint or request.path, uncompressed_bytes, len(payload), encode_seconds)
+    return response
@@ -0,0 +1,123 @@
+import math
+import numpy as np
+
+# Value each metric is divided by to scale it to [0,1] when fitting the Beta distribution.
+METRIC_MAX_VALUES = {"sew": 180, "ewa": 180, "hse": 180, "ewp": 180, "ec": 1}
+
+
+def beta_parameters(mean_val, std_val, max_val=180):
+    """
+    Fits a Beta distribution by the method of moments from a mean and a
+    (population) standard deviation. calculate_distribution_parameters uses
+    it for full arrays of values, RunningStats for accumulated ones.
+
+    Outputs:
+        {"mean": mean_val, "std": std_val, "alpha": alpha, "beta": beta}
+    """
+    m_y = mean_val / max_val
+    s_y_sq = (std_val**2) / (max_val**2)
+
+    if s_y_sq <= 0:
+        alpha = beta_val = 100  # default, very peaked
+    else:
+        factor = (m_y * (1 - m_y) / s_y_sq) - 1
+        alpha = m_y * factor
+        beta_val = (1 - m_y) * factor
+
+    return {"mean": mean_val, "std": std_val, "alpha": alpha, "beta": beta_val}
+
+
+class RunningStats:
+    """
+    Streaming count / mean / M2 accumulator for one metric (Welford, with
+    Chan et al.'s pairwise update for whole batches and for merging).
+
+    Adding a clip costs O(frames in the clip), so a player's profile never has to
+    be refit over their full history, and partial results from different workers
+    or sessions can be merged in any order.
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+    def update(self, values):
+        """Adds a batch of values (e.g. every frame of one clip)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+        batch_mean = float(np.mean(values))
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        return self._combine(values.size, batch_mean, batch_m2)
+
+    def merge(self, other):
+        """Folds another accumulator's values into this one."""
+        return self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count, mean, m2):
+        if count == 0:
+            return self
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+        return self
+
+    @property
+    def variance(self):
+        # population variance, matching np.std's default ddof=0
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def to_distribution_parameters(self, max_val=180):
+        """Same output as calculate_distribution_parameters over every value added so far."""
+        if self.count == 0:
+            raise ValueError("No values have been added")
+        return beta_parameters(self.mean, self.std, max_val)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state["count"], state["mean"], state["m2"])
+
+
+class ProfileStats:
+    """
+    One RunningStats per metric ("sew", "ewa", "hse", "ewp", "ec") for a player's view.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = dict(metrics or {})
+
+    def update(self, values_by_metric):
+        """Inputs: values_by_metric = {"sew": angles of the new clip, ...}"""
+        for metric, values in values_by_metric.items():
+            self.metrics.setdefault(metric, RunningStats()).update(values)
+        return self
+
+    def merge(self, other):
+        for metric, stats in other.metrics.items():
+            self.metrics.setdefault(metric, RunningStats()).merge(stats)
+        return self
+
+    def to_distribution_parameters(self):
+        """{metric: distribution parameters} for every metric with at least one value."""
+        return {
+            metric: stats.to_distribution_parameters(METRIC_MAX_VALUES.get(metric, 180))
+            for metric, stats in self.metrics.items()
+            if stats.count
+        }
+
+    def to_dict(self):
+        return {metric: stats.to_dict() for metric, stats in self.metrics.items()}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls({metric: RunningStats.from_dict(stats) for metric, stats in state.items()})
@@ -0,0 +1,64 @@
+import numpy as np
+from scipy.stats import beta
+
+
+def beta_scores(values, params, max_val=180.0):
+    """
+    Similarity scores (0-100) for a whole array of metric values against one Beta distribution.
+
+    Inputs:
+        values  = array of new metric values (angles in degrees, or ratios already in [0,1])
+        params  = {"mean": mean_val, "std": std_val, "alpha": alpha_val, "beta": beta_val}
+        max_val = value the metric is divided by to scale it to [0,1] (180 for angles, 1 for ratios)
+
+    Output:
+        numpy array of scores, (BetaPDF(value) / BetaPDF(mean)) * 100 clamped to [0, 100];
+        all zeros when the PDF at the mean is 0, like the single-frame comparisons.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    alpha_val, beta_val = params["alpha"], params["beta"]
+    # The normaliser is the same for every frame, so it is evaluated once.
+    pdf_mean = beta.pdf(params["mean"] / max_val, alpha_val, beta_val)
+    if pdf_mean == 0:
+        return np.zeros_like(values)
+    scores = beta.pdf(values / max_val, alpha_val, beta_val) / pdf_mean * 100
+    return np.clip(scores, 0, 100)
+
+
+def aggregate_scores(scores):
+    """
+    Clip-level summary of per-frame score arrays.
+
+    Inputs:
+        scores = dict mapping a metric name (e.g. "sew_score") to its per-frame score array
+    Output:
+        {metric: {"mean", "median", "min", "max", "std"}, ..., "overall": mean of the metric means};
+        the statistics are None when the clip has no frames.
+    """
+    summary = {}
+    for name, values in scores.items():
+        if len(values) == 0:
+            summary[name] = {"mean": None, "median": None, "min": None, "max": None, "std": None}
+            continue
+        summary[name] = {
+            "mean": float(np.mean(values)),
+            "median": float(np.median(values)),
+            "min": float(np.min(values)),
+            "max": float(np.max(values)),
+            "std": float(np.std(values)),
+        }
+    means = [metric["mean"] for metric in summary.values() if metric["mean"] is not None]
+    summary["overall"] = float(np.mean(means)) if means else None
+    return summary
+
+
+def frame_column(frames, key):
+    """
+    (N, 2) coordinates for key across a clip.
+
+    frames is either a list of per-frame dicts (as returned by analyze_video) or a
+    dict mapping each key to an already-stacked array of coordinates.
+    """
+    if isinstance(frames, dict):
+        return np.asarray(frames[key], dtype=np.float64).reshape(-1, 2)
+    return np.asarray([frame[key] for frame in frames], dtype=np.float64).reshape(-1, 2)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+from flask import Request
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class StreamingUploadRequest(Request):
+    """
+    Flask request class that writes every multipart file part straight to a
+    temporary file in upload_dir while the body is parsed, so an upload never
+    sits in memory whatever its size. The file is removed when the request
+    closes it at the end of the request.
+    """
+
+    upload_dir = tempfile.gettempdir()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        suffix = os.path.splitext(filename or "")[1]
+        return tempfile.NamedTemporaryFile("w+b", dir=self.upload_dir, prefix="shotmatch_upload_", suffix=suffix)
+
+
+def uploaded_file_path(file_storage):
+    """Path of an uploaded part on disk, with everything flushed so other processes can read it."""
+    file_storage.stream.flush()
+    return file_storage.stream.name
+
+
+def save_stream(stream, path, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Copies a file-like object to path in fixed-size chunks and returns the number of bytes written."""
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def link_or_copy(source_path, destination_path):
+    """Keeps an upload past the end of its request: hard link when possible, chunked copy otherwise."""
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        with open(source_path, "rb") as source:
+            save_stream(source, destination_path)
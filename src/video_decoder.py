@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+import cv2
+
+# codec threads per opened video, 0 lets FFmpeg pick
+DECODE_THREADS = int(os.getenv("DECODE_THREADS", 0))
+# "any" asks OpenCV for a hardware decoder (VAAPI, D3D11, ...) and falls back
+# to software when there is none; "none" always decodes in software
+HW_ACCELERATION = os.getenv("VIDEO_HW_ACCELERATION", "none")
+_ACCELERATION = {
+    "none": cv2.VIDEO_ACCELERATION_NONE,
+    "any": cv2.VIDEO_ACCELERATION_ANY,
+}
+if HW_ACCELERATION not in _ACCELERATION:
+    raise ValueError(f"VIDEO_HW_ACCELERATION must be one of {sorted(_ACCELERATION)}")
+
+
+def open_capture(source, threads=None, hw_acceleration=None):
+    """
+    Opens source with cv2.VideoCapture, passing the codec thread count and the
+    hardware acceleration as open parameters when they differ from the defaults.
+    Falls back to a plain capture if the backend rejects them.
+    """
+    threads = DECODE_THREADS if threads is None else threads
+    hw_acceleration = hw_acceleration or HW_ACCELERATION
+    if hw_acceleration not in _ACCELERATION:
+        raise ValueError(f"hw_acceleration must be one of {sorted(_ACCELERATION)}")
+    params = []
+    if threads:
+        params += [cv2.CAP_PROP_N_THREADS, threads]
+    if hw_acceleration != "none":
+        params += [cv2.CAP_PROP_HW_ACCELERATION, _ACCELERATION[hw_acceleration]]
+    if not params:
+        return cv2.VideoCapture(source)
+    cap = cv2.VideoCapture(source, cv2.CAP_ANY, params)
+    if not cap.isOpened():
+        cap.release()
+        cap = cv2.VideoCapture(source)
+    return cap
+
+
+def working_frame(frame, max_side):
+    """
+    Resizes frame so its longer side is at most max_side (0 or None keeps it as is).
+    Returns the frame both models run on and the (x, y) factors from its pixels
+    back to the original frame's.
+    """
+    h, w = frame.shape[:2]
+    if not max_side or max(h, w) <= max_side:
+        return frame, (1.0, 1.0)
+    ratio = max_side / max(h, w)
+    size = (max(1, int(round(w * ratio))), max(1, int(round(h * ratio))))
+    resized = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+    return resized, (w / size[0], h / size[1])
+
+
+class VideoDecoder:
+    """
+    Iterates (frame_index, frame, scale) over a video, or only over the frames
+    between start and end seconds. The capture seeks straight to start (FFmpeg
+    jumps to the keyframe before it and decodes forward from there), so frames
+    before the window are never returned and frames after it are never decoded.
+    frame_index stays the index in the whole video. Frames are downscaled to
+    max_side right after decoding (see working_frame).
+    """
+
+    def __init__(self, source, start=None, end=None, max_side=0, threads=None, hw_acceleration=None):
+        if start is not None and start < 0:
+            raise ValueError("start must not be negative")
+        if start is not None and end is not None and end <= start:
+            raise ValueError("end must be after start")
+        self.max_side = max_side
+        self.first_frame = 0
+        self.end_frame = None  # exclusive
+        self.decode_seconds = 0.0
+        self.cap = open_capture(source, threads, hw_acceleration)
+        if start or end is not None:
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if not fps or fps <= 0:
+                self.cap.release()
+                raise ValueError("Cannot decode a time range of a video without a frame rate")
+            if end is not None:
+                self.end_frame = int(round(end * fps))
+            if start:
+                self.first_frame = int(round(start * fps))
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.first_frame)
+
+    def frame_count(self):
+        """Number of frames in the decoded range, from the container's frame count."""
+        total = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if self.end_frame is not None:
+            total = min(total, self.end_frame)
+        return max(0, total - self.first_frame)
+
+    def __iter__(self):
+        frame_index = self.first_frame
+        while self.cap.isOpened() and (self.end_frame is None or frame_index < self.end_frame):
+            started = time.perf_counter()
+            success, frame = self.cap.read()
+            if not success:
+                self.decode_seconds += time.perf_counter() - started
+                break
+            frame, scale = working_frame(frame, self.max_side)
+            self.decode_seconds += time.perf_counter() - started
+            yield frame_index, frame, scale
+            frame_index += 1
+
+    def release(self):
+        self.cap.release()
+
+
+_END_OF_STREAM = object()
+
+
+class ThreadedDecoder:
+    """
+    Runs a VideoDecoder in a background thread that stays up to queue_size
+    frames ahead of the consumer, so decoding overlaps with the work done on
+    each frame. Iterates the same items as the decoder; a decode error is
+    raised in the consumer. Stopping the iteration early stops the thread.
+    """
+
+    def __init__(self, decoder, queue_size=32):
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.decoder = decoder
+        self.queue_size = queue_size
+        self.max_depth = 0
+
+    def __iter__(self):
+        frames = queue.Queue(maxsize=self.queue_size)
+        stop_event = threading.Event()
+        errors = []
+
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def decode():
+            try:
+                for item in self.decoder:
+                    if not put(item):
+                        return
+                    self.max_depth = max(self.max_depth, frames.qsize())
+            except Exception as error:
+                errors.append(error)
+            finally:
+                put(_END_OF_STREAM)
+
+        thread = threading.Thread(target=decode, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = frames.get()
+                if item is _END_OF_STREAM:
+                    break
+                yield item
+        finally:
+            stop_event.set()
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def frame_count(self):
+        return self.decoder.frame_count()
+
+    @property
+    def decode_seconds(self):
+        return self.decoder.decode_seconds
+
+    def release(self):
+        self.decoder.release()
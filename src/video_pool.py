@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# set in every worker by _init_worker
+_analyze = None
+
+
+def _init_worker(analyze, initializer):
+    global _analyze
+    _analyze = analyze
+    if initializer is not None:
+        initializer()
+
+
+def _analyze_one(video, options):
+    return _analyze(video, **options)
+
+
+class VideoPool:
+    """
+    Process pool that analyzes independent clips in parallel.
+
+    Workers are forked once and kept for the life of the pool, so models
+    loaded by initializer (or inherited from the parent) are only loaded once
+    per worker. analyze and initializer are inherited through fork, only the
+    videos (paths or bytes) and results cross the process boundary.
+    """
+
+    def __init__(self, analyze, max_workers=None, initializer=None):
+        self.analyze = analyze
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initializer = initializer
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                    initializer=_init_worker,
+                    initargs=(self.analyze, self.initializer),
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, videos, **options):
+        """
+        Inputs:
+            videos  = list of video paths (or video bytes) to analyze
+            options = keyword arguments passed to analyze for every video
+        Output:
+            list of (success, frames or error message), in the order of videos;
+            a failing clip does not affect the others
+        A worker that dies (e.g. out of memory) breaks every clip still pending
+        in the pool. Those clips are retried one at a time on a fresh pool, so
+        only the clip that crashes a worker on its own is reported as failed.
+        """
+        executor = self._get_executor()
+        futures = [executor.submit(_analyze_one, video, options) for video in videos]
+        results = []
+        broken = []
+        for position, future in enumerate(futures):
+            try:
+                results.append((True, future.result()))
+            except BrokenProcessPool:
+                broken.append(position)
+                results.append(None)
+            except Exception as error:
+                results.append((False, str(error)))
+        if broken:
+            self._reset(executor)
+        for position in broken:
+            results[position] = self._retry(videos[position], options)
+        return results
+
+    def _retry(self, video, options):
+        executor = self._get_executor()
+        try:
+            return True, executor.submit(_analyze_one, video, options).result()
+        except BrokenProcessPool as error:
+            self._reset(executor)
+            return False, str(error) or "Worker process died"
+        except Exception as error:
+            return False, str(error)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,44 @@
+import numpy as np
+from src.angle_engine import calculate_angles, elbow_comparison, arm_angles, front_angles
+from src.generate_side_bell_curves import calculate_angle
+from src.benchmark_angles import loop_arm_angles, loop_front_angles, random_joints, benchmark
+
+
+def test_calculate_angles_matches_scalar():
+    vertex, a, b = random_joints(200, 3, seed=1)
+    expected = [calculate_angle(v, p, q) for v, p, q in zip(vertex.tolist(), a.tolist(), b.tolist())]
+    assert np.allclose(calculate_angles(vertex, a, b), expected)
+
+
+def test_zero_length_segments_give_zero():
+    vertex = [[10, 10], [10, 10], [10, 10]]
+    a = [[10, 10], [20, 10], [10, 10]]
+    b = [[10, 20], [10, 10], [10, 10]]
+    angles = calculate_angles(vertex, a, b)
+    assert angles.tolist() == [0.0, 0.0, 0.0]
+    assert elbow_comparison([[5, 5]], [[5, 9]], [[5, 5]]).tolist() == [0.0]
+
+
+def test_arm_and_front_match_loops():
+    joints = random_joints(300, 6, seed=2)
+    # repeat points so some frames hit the zero-length branch
+    joints[1][:20] = joints[0][:20]
+    joints[2][20:40] = joints[4][20:40]
+    as_lists = [j.tolist() for j in joints]
+    for expected, actual in zip(loop_arm_angles(*as_lists[:5]), arm_angles(*joints[:5])):
+        assert np.allclose(expected, actual)
+    for expected, actual in zip(loop_front_angles(*as_lists), front_angles(*joints)):
+        assert np.allclose(expected, actual)
+
+
+def test_empty_input():
+    sew, ewa = arm_angles([], [], [], [], [])
+    assert sew.shape == (0,) and ewa.shape == (0,)
+
+
+def test_benchmark_extrapolates_the_loop_above_the_limit():
+    rows = benchmark(2_000, loop_limit=500)
+    assert [(name, frames, extrapolated) for name, frames, _, _, extrapolated in rows] == \
+        [("arm", 2_000, True), ("front", 2_000, True)]
+    assert all(loop_seconds > 0 for _, _, loop_seconds, _, _ in rows)
+    assert [row[4] for row in benchmark(500, loop_limit=500)] == [False, False]
@@ -0,0 +1,135 @@
+import base64
+import importlib
+import os
+import numpy as np
+import pytest
+import mongomock
+from src.job_queue import JobQueue
+
+CLIP = base64.b64encode(b"not really a video").decode()
+FRAMES = [{"left_wrist": [100, 200], "right_wrist": "NONE", "ball": [10, 20], "time": 0},
+          {"left_wrist": [104, 196], "right_wrist": "NONE", "ball": None, "time": 33}]
+
+
+def fake_analyze_video(video, progress=None, **kwargs):
+    if progress is not None:
+        progress(len(FRAMES), len(FRAMES))
+    return FRAMES
+
+
+@pytest.fixture(scope="module")
+def backend(tmp_path_factory):
+    root = tmp_path_factory.mktemp("backend")
+    env = {
+        "POSE_CACHE_DIR": str(root / "pose_cache"),
+        "JOB_DB_PATH": str(root / "jobs.sqlite3"),
+        "JOB_DIR": str(root / "jobs"),
+        "UPLOAD_DIR": str(root / "uploads"),
+        "WARM_UP_MODELS": "0",
+        "VIDEO_POOL_WORKERS": "1",
+        "JOB_WORKERS": "1",
+    }
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    # backend_api imports its siblings without the src. prefix
+    database = importlib.import_module("database")
+    database.get_client(mongomock.MongoClient())
+    try:
+        backend_api = importlib.import_module("backend_api")
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    yield backend_api
+    backend_api.job_queue.stop()
+    database.disconnect_mongodb()
+
+
+@pytest.fixture
+def client(backend, monkeypatch):
+    monkeypatch.setattr(backend.video_pool, "map",
+                        lambda videos, **options: [(True, fake_analyze_video(video)) for video in videos])
+    monkeypatch.setattr(backend.ocr, "analyze_video", fake_analyze_video)
+    monkeypatch.setattr(backend.ocr, "count_frames", lambda path, **window: len(FRAMES))
+    return backend.app.test_client()
+
+
+@pytest.fixture
+def jobs(backend, tmp_path, monkeypatch):
+    # created after the analysis is patched, so the forked worker runs the fakes
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), backend.run_analysis_job, num_workers=1, poll_interval=0.05)
+    monkeypatch.setattr(backend, "job_queue", queue)
+    yield queue
+    queue.stop()
+
+
+def test_process_videos_rejects_malformed_base64(client):
+    response = client.post("/process_videos", json={"videos": [{"videoUri": "clip.mp4", "base64Data": "abc$"}]})
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Invalid base64 data for video", "video": "clip.mp4"}
+
+    response = client.post("/process_videos", json={"videos": [{"videoUri": "clip.mp4"}]})
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Missing base64 data for video"
+
+    response = client.post("/process_videos", json={"videos": "clip.mp4"})
+    assert response.status_code == 400
+
+
+def test_process_videos_returns_frames(client):
+    response = client.post("/process_videos", json={"videos": [{"videoUri": "clip.mp4", "base64Data": CLIP}]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["processed_count"] == 1
+    assert body["data"] == [FRAMES]
+
+
+def test_process_consistency_videos_rejects_bad_window(client):
+    response = client.post("/process_consistency_videos", json={
+        "frontVideos": [{"videoUri": "front.mp4", "base64Data": CLIP}],
+        "sideVideos": [{"videoUri": "side.mp4", "base64Data": CLIP}],
+        "start": 2, "end": 1,
+    })
+    assert response.status_code == 400
+
+
+def test_job_is_submitted_and_polled(client, jobs):
+    response = client.post("/jobs/process_consistency_videos", json={
+        "frontVideos": [{"videoUri": "front.mp4", "base64Data": CLIP}],
+        "sideVideos": [{"videoUri": "side.mp4", "base64Data": CLIP}],
+    })
+    assert response.status_code == 202
+    submitted = response.get_json()
+    assert submitted["status"] == "queued"
+
+    response = client.get(f"{submitted['statusUrl']}?wait=10")
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job["status"] == "done"
+    assert job["progress"] == {"framesProcessed": 4, "totalFrames": 4}
+    assert job["result"]["front_data"] == [FRAMES]
+    assert job["result"]["side_data"] == [FRAMES]
+
+
+def test_job_submission_rejects_malformed_base64(client, jobs):
+    response = client.post("/jobs/process_videos", json={"videos": [{"videoUri": "clip.mp4", "base64Data": "%%%"}]})
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Invalid base64 data for video"
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_polled_job_result_is_columnar_for_msgpack(client, jobs):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.post("/jobs/process_videos", json={"videos": [{"videoUri": "clip.mp4", "base64Data": CLIP}]})
+    job_id = response.get_json()["jobId"]
+    assert jobs.wait(job_id, timeout=10)["status"] == "done"
+
+    response = client.get(f"/jobs/{job_id}", headers={"Accept": "application/x-msgpack"})
+    assert response.mimetype == "application/x-msgpack"
+    job = msgpack.unpackb(response.data)
+    assert job["status"] == "done" and job["result"]["processed_count"] == 1
+    (clip,) = job["result"]["data"]
+    assert clip["format"] == "columns" and clip["count"] == len(FRAMES)
+    assert np.frombuffer(clip["time"], dtype="<i4").tolist() == [0, 33]
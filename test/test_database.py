@@ -14,6 +14,15 @@ def mock_db():
     db = client.test_database
     return db
 
+@pytest.fixture
+def bulk_mock_db(mock_db, monkeypatch):
+    """mock_db whose bulk_write accepts pymongo >= 4.11 update requests (which pass sort=)."""
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+    monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, "add_update", add_update_without_sort)
+    return mock_db
+
 def test_add_new_package(mock_db):
     """Test adding a new package."""
     package_collection = mock_db.packages
@@ -54,3 +63,147 @@ def test_get_user_by_name(mock_db):
     result, user = get_user_by_hash(user_collection, "hash123")
     assert result is True
     assert user["username"] == "admin"
+
+def test_profiles_bulk_upsert_and_single_query_load(bulk_mock_db):
+    """Test storing and loading reference profiles."""
+    from src.database import ensure_profile_indexes, build_profile, upsert_profiles, get_profiles_for_comparison
+    from src.running_stats import ProfileStats
+    profiles = bulk_mock_db.profiles
+    assert ensure_profile_indexes(profiles)[0] is True
+    side = ProfileStats().update({"sew": [80, 90, 100], "ewa": [150, 160]})
+    front = ProfileStats().update({"hse": [30, 35], "ec": [0.1, 0.2]})
+    result, counts = upsert_profiles(profiles, [
+        build_profile("user1", "side", "left", side),
+        build_profile("user1", "front", "left", front),
+    ])
+    assert result is True and counts["upserted"] == 2
+    # upserting again replaces rather than duplicates
+    result, counts = upsert_profiles(profiles, [build_profile("user1", "side", "left", side.update({"sew": [95]}))])
+    assert counts == {"matched": 1, "modified": 1, "upserted": 0}
+    assert profiles.count_documents({}) == 2
+
+    result, loaded = get_profiles_for_comparison(profiles, "user1")
+    assert result is True
+    assert set(loaded) == {"side", "front"}
+    assert loaded["side"]["left"]["sew"]["mean"] == pytest.approx(91.25)
+    assert get_profiles_for_comparison(profiles, "user2") == (False, "Profile not found")
+
+def test_add_clip_to_profile(mock_db):
+    """Test folding clips into a stored profile one at a time."""
+    from src.database import add_clip_to_profile
+    profiles = mock_db.profiles
+    add_clip_to_profile(profiles, "user1", "side", "right", {"sew": [80, 90]})
+    result, profile = add_clip_to_profile(profiles, "user1", "side", "right", {"sew": [100]})
+    assert result is True
+    assert profile["params"]["sew"]["mean"] == pytest.approx(90)
+    assert profiles.find_one({"userId": "user1"})["revision"] == 2
+
+def test_shared_client_and_index_bootstrap():
+    """Test that connections share one client and the index bootstrap is idempotent."""
+    from src.database import connect_to_mongodb, disconnect_mongodb, ensure_indexes, get_client
+    client = mongomock.MongoClient()
+    success, db = connect_to_mongodb("auth_db", client=client)
+    assert success is True
+    assert connect_to_mongodb("other_db")[1].client is client
+    assert get_client() is client
+
+    assert ensure_indexes(db)[0] is True
+    assert ensure_indexes(db)[0] is True
+    assert "username_unique" in db.users.index_information()
+    assert "packageId_versionKey" in db.packages.index_information()
+    add_user(db.users, "admin", "hash123", True, "group1")
+    with pytest.raises(Exception):
+        db.users.insert_one({"username": "admin"})
+
+    assert disconnect_mongodb() == (True, None)
+
+def test_add_user_rejects_duplicate(mock_db):
+    """Test that a second signup for the same username is reported as a duplicate."""
+    user_collection = mock_db.users
+    assert add_user(user_collection, "admin", "hash123", True, "group1")[0] is True
+    assert add_user(user_collection, "admin", "hash456", False, "group2") == (False, "User already exists")
+    assert user_collection.find_one({"username": "admin"})["userHash"] == "hash123"
+
+def test_add_users_bulk_import(mock_db):
+    """Test importing a roster with some usernames already taken."""
+    from src.database import add_users, ensure_indexes
+    ensure_indexes(mock_db)
+    add_user(mock_db.users, "player1", "hash1", False, "team")
+    roster = [{"username": f"player{i}", "user_hash": f"hash{i}", "user_group": "team"} for i in range(5)]
+    result, summary = add_users(mock_db.users, roster)
+    assert result is True
+    assert summary == {"inserted": 4, "duplicates": ["player1"]}
+    assert mock_db.users.count_documents({}) == 5
+
+def test_data_pages_and_streaming(mock_db):
+    """Test _id range pagination, projection and the generator variant."""
+    from src.database import get_data_page, iter_data, get_users_page
+    package_collection = mock_db.packages
+    package_collection.insert_many([{"name": f"Pkg{i}", "README": "x" * 100} for i in range(7)])
+
+    names = []
+    after = None
+    while True:
+        result, page = get_data_page(package_collection, after=after, limit=3)
+        assert result is True
+        assert all("README" not in package for package in page["items"])
+        names += [package["name"] for package in page["items"]]
+        after = page["next"]
+        if after is None:
+            break
+    assert names == [f"Pkg{i}" for i in range(7)]
+
+    streamed = list(iter_data(package_collection, batch_size=2, projection={"name": 1}))
+    assert [package["name"] for package in streamed] == names
+
+    result, page = get_users_page(mock_db.users)
+    assert result is True and page == {"items": [], "next": None}
+
+def test_versions_sorted_by_stored_key(mock_db):
+    """Test that versions come back newest first without sorting in Python."""
+    from src.database import get_latest_data_by_name_or_hash, version_key
+    package_collection = mock_db.packages
+    for version in ["1.9.3", "1.10.0", "0.2", "1.10"]:
+        add_new_data(package_collection, "TestPkg", "http://example.com", "123", version=version)
+    result, packages = get_data_by_name_or_hash(package_collection, "TestPkg")
+    assert result is True
+    assert [package["version"] for package in packages] == ["1.10.0", "1.10", "1.9.3", "0.2"]
+    assert get_latest_data_by_name_or_hash(package_collection, "123")[1]["version"] == "1.10.0"
+    assert version_key("2.0") > version_key("1.99.99")
+    assert version_key("1.1234567") > version_key("1.999999")
+    assert version_key("1.007") == version_key("1.7")
+
+def test_find_package_by_name_prefix(mock_db):
+    """Test the case-insensitive prefix search on the lowercased name."""
+    package_collection = mock_db.packages
+    add_new_data(package_collection, "ShotMatch", "http://example.com", "1")
+    add_new_data(package_collection, "Other", "http://example.com", "2")
+    add_new_data(package_collection, "shot.py", "http://example.com", "3")
+    result, packages = find_package_by_regex(package_collection, "SHOT", search_readme=False)
+    assert result is True
+    assert sorted(package["name"] for package in packages) == ["ShotMatch", "shot.py"]
+    assert [p["name"] for p in find_package_by_regex(package_collection, "shot.", search_readme=False)[1]] == ["shot.py"]
+
+def test_find_package_searches_readme_text_index():
+    """Test that README matches come from the $text index and are merged without duplicates."""
+    from unittest.mock import MagicMock
+    collection = MagicMock()
+    by_name = [{"_id": 1, "name": "ShotMatch"}]
+    by_readme = [{"_id": 1, "name": "ShotMatch"}, {"_id": 2, "name": "Tracker"}]
+    collection.find.side_effect = lambda query: by_readme if "$text" in query else by_name
+    result, packages = find_package_by_regex(collection, "shot")
+    assert result is True
+    assert [package["_id"] for package in packages] == [1, 2]
+    assert collection.find.call_args_list[1].args[0] == {"$text": {"$search": "shot"}}
+
+def test_backfill_search_fields(bulk_mock_db):
+    """Test adding versionKey / nameLower to packages stored before they existed."""
+    from src.database import backfill_search_fields, version_key
+    package_collection = bulk_mock_db.packages
+    package_collection.insert_many([{"name": "Old", "version": "1.2.3"}, {"name": "Older"}])
+    assert backfill_search_fields(package_collection, batch_size=1) == (True, 2)
+    assert package_collection.find_one({"name": "Old"})["nameLower"] == "old"
+    assert package_collection.find_one({"name": "Older"})["versionKey"] == version_key("0")
+    package_collection.update_one({"name": "Old"}, {"$set": {"versionKey": "000001.000002.000003"}})
+    assert backfill_search_fields(package_collection, recompute=True) == (True, 1)
+    assert package_collection.find_one({"name": "Old"})["versionKey"] == version_key("1.2.3")
@@ -0,0 +1,146 @@
+import importlib.util
+import os
+import sys
+import types
+import pytest
+import numpy as np
+from unittest.mock import patch, MagicMock
+from src.exported_detector import ExportedDetector, letterbox, postprocess, exported_path
+from src.export_detector import DEFAULT_TOLERANCE
+import src.recognition_model as recognition_model
+
+VIDEO = os.path.join(os.path.dirname(__file__), "..", "src", "nba_test.mp4")
+
+
+def raw_output(*boxes, num_classes=80):
+    """YOLO output layout (4 + classes, candidates) from (cx, cy, w, h, class, conf) tuples."""
+    output = np.zeros((4 + num_classes, len(boxes)), dtype=np.float32)
+    for i, (cx, cy, w, h, cls_id, conf) in enumerate(boxes):
+        output[:4, i] = cx, cy, w, h
+        output[4 + cls_id, i] = conf
+    return output
+
+
+def test_letterbox_pads_to_square():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    image, scale, padding = letterbox(frame, 320)
+    assert image.shape == (1, 3, 320, 320) and image.dtype == np.float32
+    assert scale == 0.5
+    assert padding == (0, 40)
+    assert image[0, :, 0, 0] == pytest.approx(114 / 255)
+    assert image[0, :, 160, 160] == pytest.approx(0)
+
+
+def test_postprocess_maps_boxes_back_to_frame():
+    # 480x640 frame at 320: scale 0.5, 40 rows of padding on top
+    output = raw_output(
+        (160, 150, 10, 20, 32, 0.6),
+        (161, 150, 10, 20, 32, 0.9),   # same ball, higher confidence
+        (50, 50, 10, 10, 32, 0.1),     # below the confidence threshold
+        (100, 200, 40, 80, 0, 0.8),    # a person
+    )
+    result = postprocess(output, (480, 640, 3), 0.5, (0, 40))
+    assert [int(box.cls[0]) for box in result.boxes] == [32, 0]
+    assert result.boxes[0].conf[0] == pytest.approx(0.9)
+    assert recognition_model._ball_from_result(result) == [322, 220]
+    assert postprocess(raw_output((1, 1, 1, 1, 32, 0.1)), (480, 640, 3), 0.5, (0, 40)).boxes == []
+
+
+def test_backend_prefers_existing_export(tmp_path):
+    weights = recognition_model.MODEL_WEIGHTS
+    with patch.object(recognition_model, "DETECTOR_EXPORT_DIR", str(tmp_path)), \
+         patch.object(recognition_model, "runtime_available", return_value=True):
+        assert recognition_model.detector_backend() == ("pytorch", weights)
+        onnx_path = exported_path(weights, "onnxruntime", str(tmp_path))
+        open(onnx_path, "wb").close()
+        assert recognition_model.detector_backend() == ("onnxruntime", onnx_path)
+        assert recognition_model.model_settings()["backend"] == "onnxruntime"
+        with patch.object(recognition_model, "DETECTOR_BACKEND", "openvino"), pytest.raises(FileNotFoundError):
+            recognition_model.detector_backend()
+        with patch.object(recognition_model, "DETECTOR_BACKEND", "pytorch"):
+            assert recognition_model.detector_backend() == ("pytorch", weights)
+
+
+def test_exported_detectors_are_dropped_after_fork():
+    # recognition_model imports exported_detector without the src. prefix
+    exported = object.__new__(recognition_model.ExportedDetector)
+    torch_model = object()
+    with patch.object(recognition_model, "model", exported), \
+         patch.object(recognition_model, "_detectors", {"yolo11n.pt": exported, "yolo11s.pt": torch_model}):
+        recognition_model._drop_exported_detectors()
+        assert recognition_model.model is None
+        assert recognition_model._detectors == {"yolo11s.pt": torch_model}
+
+
+def spot_network(image):
+    """
+    Stand-in for the YOLO network, deterministic on its letterboxed input: one
+    ball box centred on the brightest pixel, plus a weaker duplicate for NMS.
+    """
+    channel = image[0, 0]
+    y, x = np.unravel_index(np.argmax(channel), channel.shape)
+    conf = 0.9 if channel[y, x] > 0.9 else 0.0
+    output = raw_output((x, y, 12, 12, 32, conf), (x + 1, y, 12, 12, 32, conf * 0.5))
+    return output[np.newaxis]
+
+
+def ultralytics_ball(frame, imgsz):
+    """What the PyTorch path does around the network: ultralytics' letterbox, NMS and box scaling."""
+    torch = pytest.importorskip("torch")
+    from ultralytics.data.augment import LetterBox
+    try:
+        from ultralytics.utils.nms import non_max_suppression
+    except ImportError:
+        from ultralytics.utils.ops import non_max_suppression
+    from ultralytics.utils.ops import scale_boxes
+    image = LetterBox((imgsz, imgsz), auto=False)(image=frame)
+    image = image[:, :, ::-1].transpose(2, 0, 1)[np.newaxis].astype(np.float32) / 255.0
+    output = torch.from_numpy(spot_network(image))
+    boxes = non_max_suppression(output, recognition_model.BALL_CONFIDENCE, recognition_model.NMS_IOU)[0]
+    if len(boxes) == 0:
+        return None
+    boxes[:, :4] = scale_boxes((imgsz, imgsz), boxes[:, :4], frame.shape)
+    x1, y1, x2, y2 = boxes[0, :4].tolist()
+    return [int((x1 + x2) / 2), int((y1 + y2) / 2)]
+
+
+def test_exported_path_matches_pytorch_on_every_frame():
+    # a fake onnxruntime whose session runs spot_network, so the real
+    # ExportedDetector code runs without weights or runtimes installed
+    session = MagicMock()
+    session.get_inputs.return_value = [MagicMock()]
+    session.run.side_effect = lambda _, feeds: [spot_network(next(iter(feeds.values())))]
+    runtime = types.SimpleNamespace(SessionOptions=MagicMock, InferenceSession=MagicMock(return_value=session))
+    with patch.dict(sys.modules, {"onnxruntime": runtime}):
+        detector = ExportedDetector("model.onnx", "onnxruntime", imgsz=640, num_threads=2)
+
+    rng = np.random.default_rng(0)
+    frames = []
+    for shape in ((480, 640), (720, 1280), (1920, 1080), (1080, 1920), (640, 640)):
+        for _ in range(4):
+            frame = np.zeros(shape + (3,), dtype=np.uint8)
+            y, x = rng.integers(20, shape[0] - 20), rng.integers(20, shape[1] - 20)
+            frame[y - 6:y + 6, x - 6:x + 6] = 255
+            frames.append(frame)
+        frames.append(np.zeros(shape + (3,), dtype=np.uint8))
+
+    for frame in frames:
+        expected = ultralytics_ball(frame, 640)
+        actual = recognition_model._ball_from_result(detector(frame)[0])
+        if expected is None:
+            assert actual is None
+            continue
+        assert actual is not None
+        assert max(abs(expected[0] - actual[0]), abs(expected[1] - actual[1])) <= DEFAULT_TOLERANCE
+
+
+@pytest.mark.skipif(not os.path.exists("yolo11n.pt") or importlib.util.find_spec("onnx") is None
+                    or importlib.util.find_spec("onnxruntime") is None,
+                    reason="needs yolo11n.pt, onnx and onnxruntime")
+def test_onnx_export_matches_pytorch(tmp_path):
+    from src.export_detector import export, verify
+    path = export("fast", "onnx", str(tmp_path))
+    result = verify(path, "onnxruntime", VIDEO, "fast", max_frames=30)
+    assert result["frames"] == 30
+    assert result["mismatched_frames"] == []
+    assert result["max_center_diff"] <= DEFAULT_TOLERANCE
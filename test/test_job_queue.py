@@ -0,0 +1,62 @@
+import pytest
+from src.job_queue import JobQueue
+
+
+def count_frames_handler(payload, progress):
+    if payload.get("fail"):
+        raise ValueError("Failed to process video")
+    total = payload["frames"]
+    for done in range(1, total + 1):
+        progress(done, total)
+    return {"frames": total}
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), count_frames_handler, num_workers=2, poll_interval=0.05)
+    yield queue
+    queue.stop()
+
+
+def test_submit_returns_immediately_and_job_completes(job_queue):
+    job_id = job_queue.submit("process_videos", {"frames": 5})
+    assert job_queue.get(job_id)["status"] in ("queued", "running", "done")
+    job = job_queue.wait(job_id, timeout=10)
+    assert job["status"] == "done"
+    assert job["result"] == {"frames": 5}
+    assert job["progress"] == {"framesProcessed": 5, "totalFrames": 5}
+
+
+def test_failed_job_reports_its_error(job_queue):
+    job_id = job_queue.submit("process_videos", {"fail": True})
+    job = job_queue.wait(job_id, timeout=10)
+    assert job["status"] == "failed"
+    assert "Failed to process video" in job["error"]
+
+
+def test_unknown_job(job_queue):
+    assert job_queue.get("missing") is None
+
+
+worker_threads = None
+
+
+def set_worker_threads():
+    global worker_threads
+    worker_threads = 3
+
+
+def test_workers_run_the_initializer_once_started(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lambda payload, progress: {"threads": worker_threads},
+                     num_workers=1, poll_interval=0.05, initializer=set_worker_threads)
+    queue.start()
+    try:
+        workers = list(queue._workers)
+        assert len(workers) == 1 and workers[0].is_alive()
+        job = queue.wait(queue.submit("process_videos", {}), timeout=10)
+        assert job["result"] == {"threads": 3}
+        # submit() reuses the running worker instead of forking another one
+        assert queue._workers == workers
+    finally:
+        queue.stop()
+    assert worker_threads is None
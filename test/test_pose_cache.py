@@ -0,0 +1,71 @@
+import os
+import pytest
+from src.pose_cache import PoseCache
+
+SETTINGS = {"weights": "yolo11x.pt", "ball_confidence": 0.25, "pose": {"model_complexity": 1}}
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"fake video bytes")
+    return str(path)
+
+
+def test_repeat_upload_is_served_from_cache(tmp_path, video_file):
+    cache = PoseCache(str(tmp_path / "cache"))
+    calls = []
+
+    def analyze(video_path, **kwargs):
+        calls.append(video_path)
+        return [{"ball": [1, 2], "time": 0}]
+
+    first = cache.analyze(video_file, analyze, SETTINGS)
+    second = cache.analyze(video_file, analyze, SETTINGS)
+    assert first == second == [{"ball": [1, 2], "time": 0}]
+    assert len(calls) == 1, "Second request should not re-run the models"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_content_and_settings(tmp_path, video_file):
+    cache = PoseCache(str(tmp_path / "cache"))
+    key = cache.key_for(video_file, SETTINGS)
+    assert key == cache.key_for(b"fake video bytes", SETTINGS), "Path and bytes of the same clip share a key"
+    assert key != cache.key_for(b"other video bytes", SETTINGS)
+    assert key != cache.key_for(video_file, dict(SETTINGS, ball_confidence=0.5))
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = PoseCache(str(tmp_path / "cache"), max_bytes=250)
+    frames = [{"ball": [i, i], "time": i} for i in range(3)]  # about 100 bytes of JSON
+    cache.put("a", frames)
+    cache.put("b", frames)
+    os.utime(os.path.join(cache.directory, "a.json"), (1, 1))
+    os.utime(os.path.join(cache.directory, "b.json"), (2, 2))
+    assert cache.get("a") == frames  # touching "a" makes "b" the oldest
+    cache.put("c", frames)
+    assert cache.get("b") is None
+    assert cache.get("a") == frames
+    assert cache.get("c") == frames
+    assert cache.stats()["evictions"] == 1
+
+
+def test_empty_results_are_not_cached(tmp_path, video_file):
+    cache = PoseCache(str(tmp_path / "cache"))
+    results = [[], [{"ball": [1, 2], "time": 0}]]
+    assert cache.analyze(video_file, lambda video, **kwargs: results.pop(0), SETTINGS) == []
+    assert cache.analyze(video_file, lambda video, **kwargs: results.pop(0), SETTINGS) == [{"ball": [1, 2], "time": 0}]
+    assert results == [], "The empty result must not be served from the cache"
+
+
+def test_stats_are_shared_between_processes(tmp_path):
+    import multiprocessing
+    cache = PoseCache(str(tmp_path / "cache"))
+    cache.put("a", [{"time": 0}])
+    worker = multiprocessing.get_context("fork").Process(target=lambda: (cache.get("a"), cache.get("b")))
+    worker.start()
+    worker.join()
+    cache.get("a")
+    stats = PoseCache(str(tmp_path / "cache")).stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
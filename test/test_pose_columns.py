@@ -0,0 +1,66 @@
+import json
+import numpy as np
+import pytest
+from src.pose_columns import PoseColumns, JOINT_NAMES, HIDDEN, VISIBLE, NULL, MISSING
+
+
+def make_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        frame = {}
+        for name in JOINT_NAMES:
+            frame[name] = "NONE" if rng.random() < 0.2 else rng.integers(-50, 1920, size=2).tolist()
+        frame["ball"] = rng.integers(0, 1080, size=2).tolist()
+        frame["time"] = i * 2
+        frames.append(frame)
+    return frames
+
+
+def test_round_trip_is_lossless():
+    frames = make_frames(200)
+    columns = PoseColumns.from_frames(frames)
+    assert columns.joints.dtype == np.int16
+    assert columns.to_frames() == frames
+    restored = PoseColumns.from_bytes(columns.to_bytes())
+    assert restored.to_frames() == frames
+    assert restored.state[0].tolist() == [HIDDEN if frames[0][n] == "NONE" else VISIBLE for n in JOINT_NAMES]
+
+
+def test_much_smaller_than_json():
+    # smooth joint tracks, like a real shooting motion
+    frames = []
+    for i in range(1000):
+        frame = {name: [int(500 + j * 40 + 100 * np.sin(i / 20)), int(600 + j * 30 + 80 * np.cos(i / 25))]
+                 for j, name in enumerate(JOINT_NAMES)}
+        frame["ball"] = [800 + i % 300, 400 + i % 50]
+        frame["time"] = i
+        frames.append(frame)
+    columns = PoseColumns.from_frames(frames)
+    json_size = len(json.dumps(frames).encode("utf-8"))
+    assert columns.nbytes * 4 < json_size
+    assert len(columns.to_bytes()) * 10 < json_size
+
+
+def test_large_coordinates_and_bad_keys(tmp_path):
+    frames = [{"left_wrist": [40000, 1], "ball": [1, 2], "time": 0}]
+    columns = PoseColumns.from_frames(frames)
+    assert columns.joints.dtype == np.int32
+    columns.save(tmp_path / "clip.npz")
+    assert PoseColumns.load(tmp_path / "clip.npz").to_frames() == frames
+    assert len(PoseColumns.from_frames([])) == 0
+    with pytest.raises(ValueError):
+        PoseColumns.from_frames([{"ball": [1, 2], "time": 0, "score": 3}])
+
+
+def test_absent_keys_and_none_values_survive():
+    frames = [
+        {"left_wrist": None, "ball": None},
+        {"right_wrist": [3, 4], "time": 7},
+        {},
+    ]
+    columns = PoseColumns.from_frames(frames)
+    assert columns.state[0, JOINT_NAMES.index("left_wrist")] == NULL
+    assert columns.state[0, JOINT_NAMES.index("right_wrist")] == MISSING
+    assert columns.to_frames() == frames
+    assert PoseColumns.from_bytes(columns.to_bytes()).to_frames() == frames
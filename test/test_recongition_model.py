@@ -1,8 +1,13 @@
+import io
 import pytest
 import cv2
+from pathlib import Path
 import numpy as np
 from unittest.mock import patch, MagicMock
-from src.recognition_model import detect_ball, get_landmark_xy, analyze_video
+from src.recognition_model import (
+    detect_ball, detect_balls, get_landmark_xy, analyze_video, ball_search_region,
+    count_frames, video_source, _DetectionStage
+)
 
 @pytest.fixture
 def sample_frame():
@@ -18,6 +23,59 @@ def mock_video():
     return cap_mock
 
 
+def make_capture(num_frames):
+    """Mocks cv2.VideoCapture over frames whose pixel value is the frame index."""
+    frames = [np.full((48, 64, 3), i, dtype=np.uint8) for i in range(num_frames)]
+    cap_mock = MagicMock()
+    cap_mock.isOpened.return_value = True
+    cap_mock.read.side_effect = [(True, f) for f in frames] + [(False, None)]
+    return cap_mock
+
+
+def make_pose(wrist_jump_at=None):
+    """Mocks mediapipe Pose so every frame has fully visible landmarks.
+    With wrist_jump_at set, the left wrist moves half a frame width from that frame on."""
+    class MockLandmark:
+        def __init__(self, i):
+            self.x = 0.01 * i
+            self.y = 0.02 * i
+            self.visibility = 1.0
+
+    calls = []
+
+    def process(rgb_image):
+        landmarks = [MockLandmark(i) for i in range(33)]
+        if wrist_jump_at is not None and len(calls) >= wrist_jump_at:
+            landmarks[15].x += 0.5
+        calls.append(rgb_image)
+        results = MagicMock()
+        results.pose_landmarks.landmark = landmarks
+        return results
+
+    pose_mock = MagicMock()
+    pose_mock.process.side_effect = process
+    return pose_mock
+
+
+def fake_yolo(source, **kwargs):
+    """Finds a ball on even frames only, one result per input image."""
+    frames = source if isinstance(source, list) else [source]
+    results = []
+    for frame in frames:
+        value = int(frame[0, 0, 0])
+        result = MagicMock()
+        if value % 2 == 0:
+            box = MagicMock()
+            box.cls = [32]
+            box.conf = [0.9]
+            box.xyxy = [[value, value, value + 10, value + 20]]
+            result.boxes = [box]
+        else:
+            result.boxes = []
+        results.append(result)
+    return results
+
+
 # test the detect_ball function is correctly display ball coordinate or not
 # When YOLOV11X is trying to recognize the object, it will have xyxy which will return the top left xy coordinate and bottom right xy coordinate
 def test_detect_ball(sample_frame):
@@ -64,5 +122,335 @@ def test_analyze_video(mock_video):
             assert "left_shoulder" in output_data[0], "Frame data should contain left_shoulder"
             assert "ball" in output_data[0], "Frame data should contain ball"
 
+# batched detection must map each result back to its own frame
+def test_detect_balls_keeps_frame_order():
+    frames = [np.full((48, 64, 3), i, dtype=np.uint8) for i in (2, 3, 4)]
+    with patch("src.recognition_model.model", side_effect=fake_yolo) as mock_model:
+        balls = detect_balls(frames)
+        assert mock_model.call_count == 1, "Whole batch should be a single inference"
+    assert balls == [[7, 12], None, [9, 14]]
+    assert detect_balls([]) == []
+
+
+# batched and per-frame paths should produce exactly the same frame list
+def test_analyze_video_batched_matches_per_frame():
+    outputs = {}
+    for batch_size in (1, 4):
+        stats = {}
+        with patch("cv2.VideoCapture", return_value=make_capture(10)), \
+             patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+             patch("src.recognition_model.model", side_effect=fake_yolo) as mock_model:
+            outputs[batch_size] = analyze_video("mock_video.mp4", batch_size=batch_size, stats=stats)
+            assert mock_model.call_count == stats["detection_calls"]
+        assert stats["frames"] == 10
+        assert stats["pose_frames"] == 10
+        assert "fps" in stats and "detect_fps" in stats
+    assert outputs[1] == outputs[4]
+    assert [frame["time"] for frame in outputs[1]] == [0, 2, 4, 6, 8]
+    assert outputs[4][1]["ball"] == [7, 12]
+
+
+# the threaded pipeline should match the sequential path and report its queues
+def test_analyze_video_pipeline_matches_sequential():
+    outputs = {}
+    for pipeline in (False, True):
+        stats = {}
+        with patch("cv2.VideoCapture", return_value=make_capture(12)), \
+             patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+             patch("src.recognition_model.model", side_effect=fake_yolo):
+            outputs[pipeline] = analyze_video("mock_video.mp4", batch_size=3, pipeline=pipeline, queue_size=2, stats=stats)
+    assert outputs[True] == outputs[False]
+    assert stats["frames"] == 12
+    assert 1 <= stats["queue_max_depth"]["frames"] <= 2, "Frame queue must stay bounded"
+    assert set(stats["stage_seconds"]) == {"decode", "pose", "detect"}
+
+
+# a failure inside a pipeline stage should surface instead of hanging
+def test_analyze_video_pipeline_propagates_errors():
+    with patch("cv2.VideoCapture", return_value=make_capture(6)), \
+         patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+         patch("src.recognition_model.model", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            analyze_video("mock_video.mp4", pipeline=True, queue_size=1)
+
+
+# stride sampling should cut detections and interpolate the frames in between
+def test_analyze_video_stride_interpolates_ball():
+    stats = {}
+    with patch("cv2.VideoCapture", return_value=make_capture(20)), \
+         patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+         patch("src.recognition_model.model", side_effect=fake_yolo) as mock_model:
+        output_data = analyze_video("mock_video.mp4", stride=4, stats=stats)
+        assert mock_model.call_count == 5
+    assert [frame["time"] for frame in output_data] == list(range(17))
+    assert all(frame["ball"] == [frame["time"] + 5, frame["time"] + 10] for frame in output_data)
+    assert stats["sampled_frames"] == 5
+    assert stats["skipped_frames"] == 15
+    assert stats["interpolated_frames"] == 12
+
+
+# a wrist jump should switch to dense sampling, including the frames just before it
+def test_analyze_video_wrist_motion_triggers_dense_sampling():
+    stats = {}
+    with patch("cv2.VideoCapture", return_value=make_capture(15)), \
+         patch("mediapipe.solutions.pose.Pose", return_value=make_pose(wrist_jump_at=9)), \
+         patch("src.recognition_model.model", side_effect=fake_yolo):
+        analyze_video("mock_video.mp4", batch_size=2, stride=5, motion_threshold=20, dense_frames=3, stats=stats)
+    assert stats["sampled_frames"] == 9
+    assert stats["skipped_frames"] == 6
+
+
+def test_ball_search_region():
+    joints = {"left_wrist": [50, 60], "right_wrist": "NONE"}
+    # wrist y is flipped back to image rows: 100 - 60 = 40
+    assert ball_search_region((100, 200, 3), [70, 45], joints, 20) == (40, 30, 80, 55)
+    assert ball_search_region((100, 200, 3), None, {"left_wrist": "NONE"}, 20) is None
+    assert ball_search_region((100, 200, 3), [70, 45], {}, 1000) is None, "Whole-frame crop is no crop"
+
+
+def fake_spot_yolo(source, **kwargs):
+    """Finds the single bright pixel of each image, wherever the image was cropped from."""
+    frames = source if isinstance(source, list) else [source]
+    results = []
+    for frame in frames:
+        result = MagicMock()
+        result.boxes = []
+        if frame.max() == 255:
+            y, x = np.unravel_index(np.argmax(frame[:, :, 0]), frame.shape[:2])
+            box = MagicMock()
+            box.cls = [32]
+            box.conf = [0.9]
+            box.xyxy = [[x - 2, y - 2, x + 2, y + 2]]
+            result.boxes = [box]
+        results.append(result)
+    return results
+
+
+# tracking should find the same balls as full-frame detection, mostly from crops
+def test_analyze_video_track_ball_matches_full_frame():
+    def capture():
+        frames = []
+        for i in range(8):
+            frame = np.zeros((96, 128, 3), dtype=np.uint8)
+            frame[60, 20 + 3 * i] = 255
+            frames.append(frame)
+        cap_mock = MagicMock()
+        cap_mock.isOpened.return_value = True
+        cap_mock.read.side_effect = [(True, f) for f in frames] + [(False, None)]
+        return cap_mock
+
+    outputs = {}
+    for track_ball in (False, True):
+        stats = {}
+        with patch("cv2.VideoCapture", return_value=capture()), \
+             patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+             patch("src.recognition_model.model", side_effect=fake_spot_yolo):
+            outputs[track_ball] = analyze_video("mock_video.mp4", track_ball=track_ball, roi_size=24, stats=stats)
+    assert outputs[True] == outputs[False]
+    assert outputs[True][3]["ball"] == [29, 60]
+    assert stats["roi_fallbacks"] == 1, "Only the first frame needs the full frame"
+    assert stats["roi_detections"] == 7
+
+
+# crops must not be letterboxed back up to the full input size
+def test_track_ball_crops_use_a_smaller_input_size():
+    frames = []
+    for i in range(4):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame[300, 200 + 3 * i] = 255
+        frames.append(frame)
+    cap_mock = MagicMock()
+    cap_mock.isOpened.return_value = True
+    cap_mock.read.side_effect = [(True, f) for f in frames] + [(False, None)]
+    with patch("cv2.VideoCapture", return_value=cap_mock), \
+         patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+         patch("src.recognition_model.model", side_effect=fake_spot_yolo) as mock_model:
+        analyze_video("mock_video.mp4", track_ball=True, roi_size=64)
+    sizes = [call.kwargs["imgsz"] for call in mock_model.call_args_list]
+    # the first crop only covers the wrists and misses the ball, so it falls back
+    # to the full frame at the profile's imgsz; later crops include the ball
+    assert sizes[1] == 640
+    crop_sizes = sizes[:1] + sizes[2:]
+    assert len(crop_sizes) == 4
+    assert all(size % 32 == 0 and size < 640 for size in crop_sizes)
+
+
+# a batch that ends on a miss must not lose the ball found earlier in it
+def test_track_ball_keeps_last_ball_after_a_miss():
+    def frame(x=None):
+        image = np.zeros((96, 128, 3), dtype=np.uint8)
+        if x is not None:
+            image[60, x] = 255
+        return image
+
+    stage = _DetectionStage(batch_size=2, track_ball=True, roi_size=24)
+    with patch("src.recognition_model.model", side_effect=fake_spot_yolo):
+        stage.add(0, {}, frame(20))
+        stage.add(1, {}, frame())
+        assert stage.last_ball == [20, 60]
+        stage.add(2, {}, frame(26))
+        stage.add(3, {}, frame(29))
+    assert stage.records[3][2] == [29, 60]
+    assert stage.roi_detections == 2, "The second batch is found in crops around the earlier ball"
+    assert stage.roi_fallbacks == 2
+
+
+# job workers rely on per-frame progress callbacks
+def test_analyze_video_reports_progress():
+    calls = []
+    cap_mock = make_capture(4)
+    cap_mock.get.return_value = 4
+    with patch("cv2.VideoCapture", return_value=cap_mock), \
+         patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+         patch("src.recognition_model.model", side_effect=fake_yolo):
+        analyze_video("mock_video.mp4", progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+# uploads kept in memory should decode exactly like the file on disk
+def test_video_source_decodes_from_memory():
+    video_path = Path(__file__).parent.parent / "src" / "nba_test.mp4"
+    data = video_path.read_bytes()
+    expected = count_frames(str(video_path))
+    assert expected > 0
+    assert count_frames(data) == expected
+    assert count_frames(io.BytesIO(data)) == expected
+    with video_source(str(video_path)) as source:
+        assert source == str(video_path), "Paths are opened directly"
+
+
+def test_columnar_joint_order_matches_pose_joints():
+    from src.recognition_model import POSE_JOINTS
+    from src.pose_columns import JOINT_NAMES
+    assert tuple(POSE_JOINTS) == JOINT_NAMES
+
+
+def test_detector_is_loaded_lazily_once():
+    import src.recognition_model as recognition_model
+    with patch.object(recognition_model, "model", None), \
+         patch("ultralytics.YOLO", return_value=MagicMock(side_effect=fake_yolo)) as yolo:
+        assert recognition_model.model_load_report()["detector_loaded"] is False
+        first = recognition_model.get_detector()
+        assert recognition_model.get_detector() is first
+        assert yolo.call_count == 1
+        assert "detector_load_seconds" in recognition_model.model_load_report()
+
+
+def test_pose_graph_is_reused_between_videos():
+    pose_class = MagicMock(return_value=make_pose())
+    with patch("mediapipe.solutions.pose.Pose", pose_class), \
+         patch("src.recognition_model.model", side_effect=fake_yolo):
+        for _ in range(3):
+            with patch("cv2.VideoCapture", return_value=make_capture(4)):
+                assert len(analyze_video("clip.mp4")) == 2
+    assert pose_class.call_count == 1
+    assert pose_class.return_value.reset.call_count == 3
+
+
+def test_warm_up_and_fork_reset():
+    import multiprocessing
+    from src.recognition_model import warm_up, pose_pool
+    with patch("mediapipe.solutions.pose.Pose", MagicMock(return_value=make_pose())), \
+         patch("src.recognition_model.model", side_effect=fake_yolo) as mock_model:
+        report = warm_up()
+        assert mock_model.call_count == 1
+        assert report["warm_up_seconds"] >= 0 and report["detector_loaded"]
+        assert len(pose_pool._idle) == 1
+
+        # a forked worker must not reuse the parent's pose graphs
+        parent, child = multiprocessing.Pipe()
+        worker = multiprocessing.get_context("fork").Process(target=lambda: child.send(len(pose_pool._idle)))
+        worker.start()
+        assert parent.recv() == 0
+        worker.join()
+
+
+def test_detector_profiles_select_model_and_inference_settings(sample_frame):
+    from src.recognition_model import model_settings, get_detector
+    fast_model = MagicMock(side_effect=fake_yolo)
+    with patch("src.recognition_model._detectors", {"yolo11n.pt": fast_model}), \
+         patch("src.recognition_model.model", side_effect=fake_yolo) as default_model:
+        assert detect_ball(sample_frame, profile="fast") == [5, 10]
+        assert fast_model.call_args.kwargs["imgsz"] == 480
+        assert fast_model.call_args.kwargs["augment"] is False
+        assert default_model.call_count == 0
+        detect_ball(sample_frame)
+        assert default_model.call_args.kwargs["augment"] is True
+        assert get_detector("fast") is fast_model
+    assert model_settings("fast") != model_settings("accurate")
+    assert model_settings()["profile"] == "accurate"
+    with pytest.raises(ValueError):
+        analyze_video("clip.mp4", profile="huge")
+
+
+def test_benchmark_reports_recall_per_profile(tmp_path):
+    import json
+    from benchmark_detector import load_manifest, benchmark_profile
+    manifest_path = tmp_path / "manifest.json"
+    # fake_yolo finds a ball at (v + 5, v + 10) on even frames
+    manifest_path.write_text(json.dumps({"tolerance": 3, "clips": [
+        {"video": "clip.mp4", "balls": {"0": [5, 10], "2": [7, 12], "4": [100, 100], "1": None, "3": None}},
+    ]}))
+    manifest = load_manifest(str(manifest_path))
+    with patch("cv2.VideoCapture", return_value=make_capture(6)), \
+         patch("recognition_model.model", side_effect=fake_yolo):
+        result = benchmark_profile(manifest, "accurate", batch_size=4)
+    assert result["frames"] == 6
+    assert result["recall"] == pytest.approx(2 / 3)
+    assert result["false_positive_rate"] == 0.0
+    assert result["fps"] > 0
+
+
+# both models run on one downscaled frame; results stay in original pixels
+def test_analyze_video_downscales_once_and_maps_back():
+    def capture():
+        frames = []
+        for i in range(6):
+            frame = np.zeros((384, 512, 3), dtype=np.uint8)
+            # a 4x4 block survives the 4x downscale as one bright pixel
+            frame[240:244, 80 + 12 * i:84 + 12 * i] = 255
+            frames.append(frame)
+        cap_mock = MagicMock()
+        cap_mock.isOpened.return_value = True
+        cap_mock.read.side_effect = [(True, f) for f in frames] + [(False, None)]
+        return cap_mock
+
+    outputs = {}
+    # max_side None is WORKING_MAX_SIDE, which keeps full resolution by default
+    for max_side, track_ball in ((None, False), (128, False), (128, True)):
+        pose = make_pose()
+        stats = {}
+        with patch("cv2.VideoCapture", return_value=capture()), \
+             patch("mediapipe.solutions.pose.Pose", return_value=pose), \
+             patch("src.recognition_model.model", side_effect=fake_spot_yolo) as mock_model:
+            outputs[max_side, track_ball] = analyze_video("mock_video.mp4", max_side=max_side,
+                                                          track_ball=track_ball, roi_size=64, stats=stats)
+        expected_shape = (384, 512, 3) if max_side is None else (96, 128, 3)
+        assert pose.process.call_args.args[0].shape == expected_shape
+        assert mock_model.call_args.args[0].shape[2] == 3
+    assert outputs[None, False] == outputs[128, False] == outputs[128, True]
+    assert outputs[128, False][2]["ball"] == [104, 240]
+    assert outputs[128, False][2]["left_wrist"] == [int(0.15 * 512), int((1 - 0.3) * 384)]
+    assert stats["working_scale"] == (4.0, 4.0)
+    assert stats["roi_detections"] == 5
+
+
+# analyzing a window must give the same frames as the full video
+def test_analyze_video_time_window():
+    video_path = str(Path(__file__).parent.parent / "src" / "nba_test.mp4")
+    outputs = {}
+    for options in ({"end": 0.75}, {"start": 0.5, "end": 0.75}, {"start": 0.5, "end": 0.75, "decode_thread": True}):
+        stats = {}
+        with patch("mediapipe.solutions.pose.Pose", return_value=make_pose()), \
+             patch("src.recognition_model.model", side_effect=fake_yolo):
+            outputs[tuple(options)] = analyze_video(video_path, stats=stats, **options)
+    window = outputs["start", "end"]
+    assert window and all(30 <= frame["time"] < 45 for frame in window)
+    assert window == [frame for frame in outputs["end",] if frame["time"] >= 30]
+    assert outputs["start", "end", "decode_thread"] == window
+    assert stats["frames"] == 15 and stats["first_frame"] == 30
+    assert count_frames(video_path, start=0.5, end=0.75) == 15
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,69 @@
+import gzip
+import json
+import numpy as np
+import pytest
+from flask import Flask
+from src.response_encoding import encoded_response, response_metrics
+
+FRAMES = [{"left_wrist": [100 + i, 200 + i], "right_wrist": "NONE", "ball": [i, i], "time": i} for i in range(200)]
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route("/clips")
+    def clips():
+        return encoded_response({"message": "ok", "data": [FRAMES, None]}, 200, frame_fields=("data",))
+
+    return app.test_client()
+
+
+def test_plain_json_without_negotiation(client):
+    response = client.get("/clips", headers={"Accept-Encoding": "identity"})
+    assert response.mimetype == "application/json"
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()["data"][0] == FRAMES
+    assert int(response.headers["X-Response-Bytes"]) == len(response.data)
+    assert float(response.headers["X-Encode-Time-Ms"]) >= 0
+
+
+def test_gzip_compression(client):
+    response = client.get("/clips", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    body = gzip.decompress(response.data)
+    assert json.loads(body)["data"][0] == FRAMES
+    assert len(response.data) * 5 < int(response.headers["X-Uncompressed-Bytes"])
+    assert response_metrics.stats()["clips"]["responses"] >= 1
+
+
+def test_brotli_compression(client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/clips", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.data))["data"][0] == FRAMES
+
+
+def test_msgpack_columnar_body(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/clips", headers={"Accept": "application/x-msgpack", "Accept-Encoding": "identity"})
+    assert response.mimetype == "application/x-msgpack"
+    body = msgpack.unpackb(response.data)
+    clip, missing = body["data"]
+    assert missing is None
+    joints = np.frombuffer(clip["joints"], dtype="<i2").reshape(clip["count"], len(clip["jointNames"]), 2)
+    assert joints[5, clip["jointNames"].index("left_wrist")].tolist() == [105, 205]
+    assert np.frombuffer(clip["time"], dtype="<i4").tolist() == list(range(200))
+
+
+def test_msgpack_columnar_nested_field():
+    msgpack = pytest.importorskip("msgpack")
+    from src.response_encoding import encode_body
+    body = {"status": "done", "result": {"data": [FRAMES], "processed_count": 1}}
+    packed = msgpack.unpackb(encode_body(body, "application/x-msgpack", ("result.data", "result.side_data")))
+    assert packed["result"]["processed_count"] == 1
+    assert packed["result"]["data"][0]["count"] == len(FRAMES)
+    # the caller's body is left as it was, and a queued job without a result still encodes
+    assert body["result"]["data"] == [FRAMES]
+    assert msgpack.unpackb(encode_body({"status": "queued"}, "application/x-msgpack", ("result.data",))) == \
+        {"status": "queued"}
@@ -0,0 +1,42 @@
+import json
+import numpy as np
+import pytest
+from src.generate_side_bell_curves import calculate_distribution_parameters
+from src.running_stats import RunningStats, ProfileStats
+
+
+def test_clip_by_clip_matches_full_fit():
+    rng = np.random.default_rng(0)
+    clips = [rng.normal(90, 10, size=n) for n in (1, 40, 250, 7)]
+    stats = RunningStats()
+    for clip in clips:
+        stats.update(clip)
+    expected = calculate_distribution_parameters(np.concatenate(clips))
+    actual = stats.to_distribution_parameters()
+    for key in ("mean", "std", "alpha", "beta"):
+        assert actual[key] == pytest.approx(expected[key], rel=1e-9)
+
+
+def test_merge_is_order_independent():
+    rng = np.random.default_rng(1)
+    a, b = rng.uniform(0, 180, 100), rng.uniform(0, 180, 30)
+    merged = RunningStats().update(a).merge(RunningStats().update(b))
+    reverse = RunningStats().update(b).merge(RunningStats().update(a))
+    assert merged.count == 130
+    assert merged.mean == pytest.approx(reverse.mean)
+    assert merged.std == pytest.approx(np.std(np.concatenate([a, b])))
+
+
+def test_constant_values_and_empty_state():
+    assert RunningStats().update([45, 45]).to_distribution_parameters()["alpha"] == 100
+    with pytest.raises(ValueError):
+        RunningStats().to_distribution_parameters()
+
+
+def test_profile_round_trips_through_json():
+    profile = ProfileStats().update({"sew": [80, 90, 100], "ec": [0.1, 0.2]})
+    restored = ProfileStats.from_dict(json.loads(json.dumps(profile.to_dict())))
+    restored.update({"sew": [95]})
+    params = restored.to_distribution_parameters()
+    assert params["sew"]["mean"] == pytest.approx(calculate_distribution_parameters(np.array([80, 90, 100, 95]))["mean"])
+    assert params["ec"] == pytest.approx(calculate_distribution_parameters(np.array([0.1, 0.2]), max_val=1))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from src.generate_side_statistics import compare_arm, compare_arm_batch
+from src.generate_front_statistics import compare_front, compare_front_batch
+from src.scoring import beta_scores, aggregate_scores
+
+SEW_PARAMS = {"mean": 45.0, "std": 5.0, "alpha": 2.0, "beta": 3.0}
+EWA_PARAMS = {"mean": 50.0, "std": 6.0, "alpha": 2.5, "beta": 3.5}
+HSE_PARAMS = {"mean": 30.0, "std": 4.0, "alpha": 1.5, "beta": 2.0}
+EWP_PARAMS = {"mean": 60.0, "std": 6.0, "alpha": 2.5, "beta": 3.5}
+EC_PARAMS = {"mean": 0.1, "std": 0.05, "alpha": 2.0, "beta": 8.0}
+
+
+def random_frames(keys, num_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{key: rng.integers(0, 400, size=2).tolist() for key in keys} for _ in range(num_frames)]
+
+
+def test_compare_arm_batch_matches_single_frame():
+    keys = [f"left_{name}" for name in ("shoulder", "elbow", "wrist", "pinky", "index")]
+    frames = random_frames(keys, 50)
+    result = compare_arm_batch(frames, "left", SEW_PARAMS, EWA_PARAMS)
+    expected = [compare_arm(frame, "left", SEW_PARAMS, EWA_PARAMS) for frame in frames]
+    for name in ("sew_score", "ewa_score"):
+        assert np.allclose(result[name], [scores[name] for scores in expected])
+        assert result["aggregates"][name]["mean"] == pytest.approx(np.mean(result[name]))
+
+
+def test_compare_front_batch_matches_single_frame():
+    keys = ["hip", "shoulder", "left_elbow", "right_elbow", "wrist", "pinky"]
+    frames = random_frames(keys, 50, seed=1)
+    result = compare_front_batch(frames, HSE_PARAMS, SEW_PARAMS, EWP_PARAMS, EC_PARAMS)
+    expected = [compare_front(frame, HSE_PARAMS, SEW_PARAMS, EWP_PARAMS, EC_PARAMS) for frame in frames]
+    for name in ("hse_score", "sew_score", "ewp_score", "ec_score"):
+        assert np.allclose(result[name], [scores[name] for scores in expected])
+
+
+def test_beta_scores_zero_mean_pdf_and_clamping():
+    # the PDF is 0 at the edges when alpha, beta > 1
+    assert beta_scores([10, 90], {"mean": 0.0, "alpha": 2.0, "beta": 3.0}).tolist() == [0.0, 0.0]
+    scores = beta_scores([0, 45, 90, 179], SEW_PARAMS)
+    assert scores.min() >= 0 and scores.max() <= 100
+
+
+def test_aggregate_scores_empty_clip():
+    summary = aggregate_scores({"sew_score": np.array([])})
+    assert summary["sew_score"]["mean"] is None
+    assert summary["overall"] is None
+
+
+def test_reference_profile_matches_exact_scores_within_bound():
+    from src.reference_profile import ReferenceProfile
+    profile = ReferenceProfile({"sew": SEW_PARAMS, "ewa": EWA_PARAMS, "ec": EC_PARAMS}, resolution=2048)
+    angles = np.random.default_rng(3).uniform(0, 180, size=1000)
+    for metric in ("sew", "ewa"):
+        params = SEW_PARAMS if metric == "sew" else EWA_PARAMS
+        error = np.abs(profile.score(metric, angles) - beta_scores(angles, params))
+        assert error.max() <= profile.error_bounds[metric] + 1e-9
+    ratios = np.linspace(0, 1, 101)
+    assert np.allclose(profile.score("ec", ratios), beta_scores(ratios, EC_PARAMS, max_val=1.0), atol=0.05)
+    assert profile.score("sew", [-5, 200]).tolist() == [0.0, 0.0]
+
+
+def test_reference_profile_error_bound_holds_between_table_points():
+    from src.reference_profile import ReferenceProfile
+    angles = np.linspace(0, 180, 2 ** 21 + 1)
+    exact = beta_scores(angles, SEW_PARAMS)
+    for resolution in (16, 64, 256, 1024):
+        profile = ReferenceProfile({"sew": SEW_PARAMS}, resolution=resolution)
+        true_error = np.abs(profile.score("sew", angles) - exact).max()
+        assert true_error <= profile.error_bounds["sew"]
+        assert profile.error_bounds["sew"] < 2 * true_error
+
+
+def test_reference_profile_tolerance():
+    from src.reference_profile import ReferenceProfile
+    with pytest.raises(ValueError):
+        ReferenceProfile({"sew": SEW_PARAMS}, resolution=4, tolerance=1e-6)
@@ -0,0 +1,53 @@
+import io
+import os
+import pytest
+from flask import Flask, request, jsonify
+from src.uploads import StreamingUploadRequest, uploaded_file_path, save_stream, link_or_copy
+
+
+@pytest.fixture
+def upload_app(tmp_path):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    kept_dir = tmp_path / "kept"
+    kept_dir.mkdir()
+
+    class TestRequest(StreamingUploadRequest):
+        pass
+
+    TestRequest.upload_dir = str(upload_dir)
+    app = Flask(__name__)
+    app.request_class = TestRequest
+
+    @app.route("/upload", methods=["POST"])
+    def upload():
+        files = request.files.getlist("videos")
+        paths = [uploaded_file_path(f) for f in files]
+        link_or_copy(paths[0], str(kept_dir / "first.mp4"))
+        with open(paths[0], "rb") as f:
+            first = f.read()
+        return jsonify({"paths": paths, "size": len(first), "matches": first == b"a" * 300000})
+
+    return app, upload_dir, kept_dir
+
+
+def test_multipart_parts_are_written_to_upload_dir(upload_app):
+    app, upload_dir, kept_dir = upload_app
+    client = app.test_client()
+    response = client.post("/upload", data={
+        "videos": [(io.BytesIO(b"a" * 300000), "front.mp4"), (io.BytesIO(b"b" * 10), "side.mp4")]
+    }, content_type="multipart/form-data")
+    body = response.get_json()
+    assert body["matches"] is True
+    assert all(os.path.dirname(path) == str(upload_dir) for path in body["paths"])
+    assert all(path.endswith(".mp4") for path in body["paths"])
+    # request files are removed when the request ends, kept copies are not
+    assert os.listdir(upload_dir) == []
+    assert (kept_dir / "first.mp4").read_bytes() == b"a" * 300000
+
+
+def test_save_stream_copies_in_chunks(tmp_path):
+    path = tmp_path / "clip.mp4"
+    written = save_stream(io.BytesIO(b"x" * 2500), str(path), chunk_size=1000)
+    assert written == 2500
+    assert path.read_bytes() == b"x" * 2500
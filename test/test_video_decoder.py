@@ -0,0 +1,69 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from src.video_decoder import VideoDecoder, ThreadedDecoder, open_capture, working_frame
+
+VIDEO = str(Path(__file__).parent.parent / "src" / "nba_test.mp4")
+
+
+def decode_all(**kwargs):
+    decoder = VideoDecoder(VIDEO, **kwargs)
+    try:
+        return [(index, frame) for index, frame, _ in decoder], decoder.frame_count()
+    finally:
+        decoder.release()
+
+
+def test_time_range_seeks_to_the_same_frames():
+    full, total = decode_all(end=0.75)
+    window, count = decode_all(start=0.5, end=0.75)
+    # the clip is 60 fps
+    assert [index for index, _ in window] == list(range(30, 45))
+    assert count == 15 and total == len(full) == 45
+    for index, frame in window:
+        assert np.array_equal(frame, full[index][1])
+
+
+def test_reduced_resolution_and_codec_threads():
+    decoder = VideoDecoder(VIDEO, end=0.1, max_side=320, threads=2)
+    try:
+        frames = list(decoder)
+    finally:
+        decoder.release()
+    assert len(frames) == 6
+    _, frame, scale = frames[0]
+    assert max(frame.shape[:2]) == 320
+    assert scale[0] == pytest.approx(scale[1], rel=0.01) and scale[0] > 1
+
+
+def test_threaded_decoder_matches_and_stops_early():
+    expected, _ = decode_all(end=0.25)
+    threaded = ThreadedDecoder(VideoDecoder(VIDEO, end=0.25), queue_size=4)
+    try:
+        frames = [(index, frame) for index, frame, _ in threaded]
+        assert [index for index, _ in frames] == [index for index, _ in expected]
+        assert threaded.max_depth <= 4
+        for index, _, _ in ThreadedDecoder(VideoDecoder(VIDEO), queue_size=2):
+            if index == 3:
+                break
+    finally:
+        threaded.release()
+
+
+def test_invalid_ranges_and_open_params():
+    with pytest.raises(ValueError):
+        VideoDecoder(VIDEO, start=2, end=1)
+    with pytest.raises(ValueError):
+        open_capture(VIDEO, hw_acceleration="gpu")
+    cap = open_capture(VIDEO, threads=1, hw_acceleration="any")
+    assert cap.isOpened()
+    cap.release()
+
+
+def test_working_frame_keeps_small_frames():
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    assert working_frame(frame, 1280)[0] is frame
+    assert working_frame(frame, 0)[1] == (1.0, 1.0)
+    resized, scale = working_frame(np.zeros((2160, 3840, 3), dtype=np.uint8), 1280)
+    assert resized.shape == (720, 1280, 3)
+    assert scale == (3.0, 3.0)
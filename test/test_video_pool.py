@@ -0,0 +1,41 @@
+import os
+import pytest
+from src.video_pool import VideoPool
+
+
+def fake_analyze(video_path):
+    if "crash" in video_path:
+        os._exit(1)
+    if "broken" in video_path:
+        raise ValueError(f"Cannot decode {video_path}")
+    return [{"time": 0, "pid": os.getpid(), "video": video_path}]
+
+
+@pytest.fixture
+def video_pool():
+    pool = VideoPool(fake_analyze, max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_results_keep_request_order(video_pool):
+    paths = [f"clip_{i}.mp4" for i in range(6)]
+    outcomes = video_pool.map(paths)
+    assert all(success for success, _ in outcomes)
+    assert [frames[0]["video"] for _, frames in outcomes] == paths
+    assert all(frames[0]["pid"] != os.getpid() for _, frames in outcomes), "Clips should run in worker processes"
+
+
+def test_failed_clip_does_not_drop_the_others(video_pool):
+    outcomes = video_pool.map(["front.mp4", "broken.mp4", "side.mp4"])
+    assert outcomes[0][0] is True and outcomes[2][0] is True
+    assert outcomes[1] == (False, "Cannot decode broken.mp4")
+    # the pool keeps working after a failed clip
+    assert video_pool.map(["again.mp4"])[0][0] is True
+
+
+def test_crashed_worker_only_fails_its_own_clip(video_pool):
+    outcomes = video_pool.map(["a.mp4", "crash.mp4", "b.mp4", "c.mp4", "d.mp4"])
+    assert [success for success, _ in outcomes] == [True, False, True, True, True]
+    assert [frames[0]["video"] for success, frames in outcomes if success] == ["a.mp4", "b.mp4", "c.mp4", "d.mp4"]
+    assert video_pool.map(["again.mp4"])[0][0] is True